@@ -18,6 +18,18 @@ Indizes oder fehlenden Handelstagen.
 
 import pandas as pd  # Kernbibliothek für Zeitreihen-Manipulation
 
+def _as_utc(df: pd.DataFrame) -> pd.DataFrame:
+    """Tz-naiven Index als UTC interpretieren, ohne die Daten zu kopieren.
+
+    ``DataFrame.tz_localize`` kopiert alle Spalten; hier wird nur der Index
+    ersetzt (flache Kopie, der Input bleibt unverändert).
+    """
+    if df.index.tz is not None:  # bereits tz-aware → nichts zu tun
+        return df
+    out = df.copy(deep=False)  # neue Hülle, gleiche Datenblöcke
+    out.index = df.index.tz_localize("UTC")  # nur der Index wird neu erzeugt
+    return out
+
 def align_to_trading_days(df: pd.DataFrame, cal_idx: pd.DatetimeIndex) -> pd.DataFrame:
     """Preisreihen strikt auf vorgegebene Handelstage ausrichten.
 
@@ -33,8 +45,7 @@ def align_to_trading_days(df: pd.DataFrame, cal_idx: pd.DatetimeIndex) -> pd.Dat
     pd.DataFrame
         Reindizierte Serie, fehlende Tage bleiben ``NaN``.
     """
-    if df.index.tz is None:  # falls Datumsindex zeitzonen-naiv ist
-        df = df.tz_localize("UTC")  # auf UTC setzen für eindeutige Vergleiche
+    df = _as_utc(df)  # auf UTC setzen für eindeutige Vergleiche
     return df.reindex(cal_idx)  # harte Reindizierung ohne Füllung
 
 def resample_crypto_last(df: pd.DataFrame, cal_idx: pd.DatetimeIndex) -> pd.DataFrame:
@@ -55,7 +66,13 @@ def resample_crypto_last(df: pd.DataFrame, cal_idx: pd.DatetimeIndex) -> pd.Data
     pd.DataFrame
         Serie mit einem Wert pro Handelstag.
     """
-    if df.index.tz is None:  # sicherstellen, dass Index tz-aware ist
-        df = df.tz_localize("UTC")
-    daily = df.resample("1D").last()  # tägliche Aggregation, unabhängig vom Kalender
+    df = _as_utc(df)  # sicherstellen, dass Index tz-aware ist
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()  # "letzte" Beobachtung = zeitlich letzte
+    days = df.index.floor("D")  # Kalendertag je Beobachtung, ohne lückenloses Tagesgitter
+    if days.is_unique:  # Tagesdaten (Normalfall): bereits eine Zeile je Tag
+        daily = df.copy(deep=False)  # flache Kopie, nur der Index wird ersetzt
+        daily.index = days
+    else:  # Intraday: letzte gültige Beobachtung je Tag und Spalte (wie ``resample.last``)
+        daily = df.groupby(days).last()
     return daily.reindex(cal_idx)  # auf Handelstage ausrichten
@@ -7,8 +7,9 @@
 #   Metadaten.
 # Ein-/Ausgabe: MultiIndex-Panel ``(date, asset)`` → erweitertes Feature-Panel
 #   sowie optionale Parquet/Manifest-Dateien.
-# Abhängigkeiten: ``pandas``, ``numpy`` sowie eigene Feature-Module; Stolpersteine
-#   sind falsche Datentypen oder bereits vorhandenes CASH-Asset.
+# Abhängigkeiten: ``pandas``, ``numpy`` sowie eigene Feature-Module (optional
+#   ``numba`` für den TA-Kernel); Stolpersteine sind falsche Datentypen oder
+#   bereits vorhandenes CASH-Asset.
 # ---------------------------------------------------------------------------
 """
 Erzeugt das finale Feature-Panel (CLEAN) inklusive synthetischem CASH-Asset.
@@ -23,49 +24,230 @@ from __future__ import annotations
 # ``Optional``-Alias für optionale Parameter bei Manifest/Output-Pfaden
 from typing import Optional
 # Metainformationen über Python-Version usw. für Manifest
+import os  # Anzahl CPU-Kerne für Thread-Pool
 import platform  # Versionsinfo fürs Manifest
+from concurrent.futures import ThreadPoolExecutor  # parallele Asset-Blöcke
 import numpy as np  # numerische Operationen
 import pandas as pd  # Datenverarbeitung
 from pathlib import Path  # Pfad-Manipulation
 
 
 # Stabiler Parquet-Schreiber mit Engine-Fallbacks
-from src.utils.parquet_io import save_parquet  # stabiler IO-Wrapper
+from src.utils.parquet_io import save_parquet_chunked  # jahresweise gestreamtes Schreiben
 # Manifest-Helfer für Prüfsummen und Commit-Referenzen
 from utils.manifest import write_manifest, file_summary, current_commit_short  # Manifest-Helfer
 
 # Feature-Funktionen aus euren Modulen
-from src.features.basic_indicator import (
-    returns,
-    corwin_schultz_beta,
-    corwin_schultz_gamma,
-    corwin_schultz_alpha,
-    becker_parkinson_sigma,     # Volaproxy
-    corwin_schultz_spread,      # finaler Spread
-)
+from src.features import _numba_loops as _nl  # optionale JIT-Kernel (``HAVE_NUMBA``)
+from src.features.basic_indicator import corwin_schultz_bundle  # Spread-/Volaproxies in einem Aufruf
 # Technische Indikatoren zur Trend-/Volatilitätsanalyse
 from src.features.technical_indicators import (
     average_dollar_volume,            # Umsatzbasierte Liquidität
     simple_moving_average,            # Gleichgewichteter gleitender Mittelwert
     exponential_moving_average,       # EMA mit stärkerem Gewicht auf jüngste Werte
     relative_strength_index,          # Momentum-Oszillator (0-100)
-    moving_average_convergence_divergence,  # Trendfolger mit zwei EMAs
+    macd_from_emas,                   # MACD-Trendfolger aus vorhandenen EMAs
     bollinger,                        # Bänder auf Basis SMA und StdAbw
     commodity_channel_index,          # Abweichung vom gleitenden Mittel
-    average_directional_index,        # Trendstärke via +DI/-DI
+    directional_movement_index,       # Trendstärke via +DI/-DI (ADX)
+)
+
+
+# Spaltenschema der CLEAN-Stufe (Reihenfolge = Ausgabe), gefolgt vom Flag ``is_cash``
+RAW_FIELDS = ("open", "high", "low", "close", "adj_close", "volume", "dividends", "stock_splits")
+FEATURE_COLUMNS = (
+    # Core
+    "daily_return_log", "average_dollar_volume_20",
+    "volatility_becker_parkinson", "bid_ask_spread_corwin_schultz",
+    # Technische Indikatoren
+    "simple_moving_average_20", "simple_moving_average_60",
+    "exponential_moving_average_12", "exponential_moving_average_26",
+    "relative_strength_index_14",
+    "macd_line_12_26_9", "macd_signal_12_26_9", "macd_histogram_12_26_9",
+    "bollinger_middle_band_20_2.0", "bollinger_upper_band_20_2.0",
+    "bollinger_lower_band_20_2.0", "bollinger_bandwidth_20_2.0",
+    "commodity_channel_index_20",
+    "average_directional_index_14", "positive_directional_index_14", "negative_directional_index_14",
+    # Exec
+    "execution_price_t_plus_1_open",
+)
+# Laufzeitumgebung fürs Manifest, einmal beim Import ermittelt
+_PYVER = platform.python_version()
+_PDVER = pd.__version__
+
+# Zusammenhängender Block der TA-Indikatoren (Slots des spezialisierten Kernels)
+_TA_SLOTS = slice(
+    FEATURE_COLUMNS.index("simple_moving_average_20"),
+    FEATURE_COLUMNS.index("negative_directional_index_14") + 1,
 )
+# Slots der Spread-/Vola-Proxies (fusionierter Corwin–Schultz-Kernel)
+_SIGMA_K = FEATURE_COLUMNS.index("volatility_becker_parkinson")
+_SPREAD_K = FEATURE_COLUMNS.index("bid_ask_spread_corwin_schultz")
 
 
 def _downcast_feature_dtypes(df: pd.DataFrame) -> pd.DataFrame:
     """Speicherfreundliche Datentypen für Feature-Spalten setzen."""
-    for c in df.columns:  # jede Spalte einzeln prüfen
-        if c == "is_cash":
-            df[c] = df[c].astype("int8")  # Flag benötigt nur wenige Bits
-        elif pd.api.types.is_float_dtype(df[c]):
-            df[c] = df[c].astype("float32")  # Float‑Features auf 32 Bit
-        elif pd.api.types.is_integer_dtype(df[c]):
-            df[c] = df[c].astype("int64")  # int64 für Mengen/Volumen
-    return df  # DataFrame mit optimierten Datentypen zurückgeben
+    dtypes = df.dtypes
+    # Klassifikation einmal je vorkommendem dtype statt je Spalte
+    kind = {
+        dt: "float32" if pd.api.types.is_float_dtype(dt) else "int64" if pd.api.types.is_integer_dtype(dt) else None
+        for dt in dtypes.unique()
+    }
+    dtype_map = {}  # Zieltyp je Spalte, nur dort, wo sich etwas ändert
+    for c, dt in dtypes.items():
+        target = "int8" if c == "is_cash" else kind[dt]  # Flag benötigt nur wenige Bits
+        if target is not None and dt != target:  # übrige Typen unverändert
+            dtype_map[c] = target
+    return df.astype(dtype_map, copy=False) if dtype_map else df  # ein einziger astype-Aufruf
+
+
+def _wide_fields(prices: pd.DataFrame) -> dict:
+    """Rohfelder als breite Matrizen ``Datum × Asset`` (Structure of Arrays).
+
+    Ist das sortierte Panel ein volles Gitter (INTERIM ist kalenderausgerichtet),
+    genügt ein ``reshape`` der Spalten-Arrays: Views ohne Kopie und ohne
+    Hash-basiertes ``unstack``. Sonst greift ``unstack`` mit NaN für Lücken;
+    die Features solcher Assets rechnet ``build_clean_data`` dann auf deren
+    eigenen Zeilen, nicht über das aufgefüllte Gitter.
+    """
+    idx = prices.index
+    n_dates, n_assets = len(idx.levels[0]), len(idx.levels[1])
+    full = len(prices) == n_dates * n_assets and (
+        np.array_equal(idx.codes[0], np.repeat(np.arange(n_dates), n_assets))  # Datum äußere Ebene
+        and np.array_equal(idx.codes[1], np.tile(np.arange(n_assets), n_dates))  # Asset innere Ebene
+    )
+    if not full:
+        return {c: prices[c].unstack("asset") for c in RAW_FIELDS}
+    dates = idx.levels[0].rename("date")
+    assets = idx.levels[1].rename("asset")
+    return {
+        c: pd.DataFrame(prices[c].to_numpy(dtype=np.float64).reshape(n_dates, n_assets), index=dates, columns=assets)
+        for c in RAW_FIELDS
+    }
+
+
+def _asset_features(wide: dict, out: np.ndarray, cs_sample_length: int = 1) -> None:
+    """Alle Features für einen Block von Assets in einen Ausgabepuffer schreiben.
+
+    Ohne geteilten Zustand außer dem eigenen Pufferausschnitt, damit
+    Asset-Blöcke parallel in Threads laufen können (numba- und
+    pandas-Fensterkernel geben die GIL frei).
+
+    Parameters
+    ----------
+    wide : dict
+        Breite Preisfelder ``open/high/low/close/volume`` (Datum × Asset).
+    out : np.ndarray
+        float32-Sicht ``(Datum, Asset, Feature)`` in Reihenfolge von
+        ``FEATURE_COLUMNS``; gerechnet wird in float64, gecastet beim Schreiben.
+    cs_sample_length : int
+        Fenster für Corwin–Schultz-Spread-Schätzung.
+    """
+    close = wide["close"]  # häufig genutzte Schlusskurse
+
+    # Core-Features: Log-Rendite als Differenz der Log-Kurse (ein Log-Durchlauf, keine Division)
+    c64 = close.to_numpy(dtype=np.float64)  # einmal konvertiert für Rendite und Kernel
+    with np.errstate(divide="ignore", invalid="ignore"):  # Nullkurse → ±inf/NaN wie ``np.log(a / b)``
+        logc = np.log(c64)
+        out[0, :, 0] = np.nan  # erster Tag ohne Vortag
+        np.subtract(logc[1:], logc[:-1], out=out[1:, :, 0], casting="same_kind")  # direkt in den float32-Puffer
+
+    if _nl.HAVE_NUMBA:
+        # Liquidität: Close×Volume und gleitendes Mittel in einem Durchlauf je Spalte
+        _nl._adv_block(c64, wide["volume"].to_numpy(dtype=np.float64), 20, out[:, :, 1])
+        high = wide["high"].to_numpy(dtype=np.float64)  # einmal konvertiert für beide Kernel
+        low = wide["low"].to_numpy(dtype=np.float64)
+        # Spread-Proxies: Beta/Gamma/Alpha fusioniert, ohne Zwischenmatrizen
+        _nl._cs_block(high, low, int(cs_sample_length or 1), out[:, :, _SIGMA_K], out[:, :, _SPREAD_K],
+                      _nl.NO_OUT, _nl.NO_OUT, _nl.NO_OUT)
+        # TA-Features: fester Indikatorsatz → ein spezialisierter Kernel je Asset-Spalte
+        _nl._ta_block(high, low, c64, out[:, :, _TA_SLOTS])
+    else:
+        out[:, :, 1] = average_dollar_volume(close, wide["volume"], window=20).to_numpy()  # Liquidität
+        cs = corwin_schultz_bundle(wide["high"], wide["low"], sample_length=cs_sample_length)  # Spread-Proxies
+        out[:, :, _SIGMA_K] = cs["sigma"].to_numpy()  # Volatilität aus High/Low
+        out[:, :, _SPREAD_K] = cs["spread"].to_numpy()  # Bid-Ask-Spread
+
+        sma20 = simple_moving_average(close, 20)  # kurzfristiger Trend
+        sma60 = simple_moving_average(close, 60)  # längerfristiger Trend
+        ema12 = exponential_moving_average(close, 12)  # schnell reagierend
+        ema26 = exponential_moving_average(close, 26)  # träge EMA
+        rsi14 = relative_strength_index(close, 14)  # Momentummaß
+        macd_line, macd_signal, macd_hist = macd_from_emas(ema12, ema26, 9)  # EMAs wiederverwenden
+        boll_mid, boll_up, boll_lo, boll_bw = bollinger(close, 20, 2.0)  # Bollinger-Bänder
+        cci20 = commodity_channel_index(wide["high"], wide["low"], close, 20)
+        adx14, plus_di14, minus_di14 = directional_movement_index(wide["high"], wide["low"], close, 14)
+
+        values = (  # exakt in Reihenfolge von FEATURE_COLUMNS[_TA_SLOTS]
+            sma20, sma60, ema12, ema26, rsi14,  # Trend/Momentum
+            macd_line, macd_signal, macd_hist,  # MACD
+            boll_mid, boll_up, boll_lo, boll_bw,  # Bollinger
+            cci20, adx14, plus_di14, minus_di14,  # CCI/ADX
+        )
+        for k, frame in enumerate(values, start=_TA_SLOTS.start):  # Slot k ↔ FEATURE_COLUMNS[k]
+            out[:, :, k] = frame.to_numpy()
+
+    # Exec: Open des Folgetags (t+1-Ausführung) als verschobene Kopie, ohne ``shift``-Frame
+    exec_k = FEATURE_COLUMNS.index("execution_price_t_plus_1_open")
+    out[:-1, :, exec_k] = wide["open"].to_numpy()[1:]
+    out[-1:, :, exec_k] = np.nan  # letzter Tag ohne Folgetag
+
+
+def _cash_values(
+    dates: pd.DatetimeIndex,
+    risk_free_annual: pd.Series,
+    day_count: int = 360,
+) -> np.ndarray:
+    """CASH-Werte als float32-Matrix ``(Tag, Spalte)`` im CLEAN-Schema.
+
+    Parameters
+    ----------
+    dates : pd.DatetimeIndex
+        Handelstage, auf denen das Asset notiert.
+    risk_free_annual : pd.Series
+        Jahreszins (dezimal) pro Handelstag.
+    day_count : int
+        Zins-Basis, meist 360.
+
+    Returns
+    -------
+    np.ndarray
+        Spalten in Reihenfolge ``RAW_FIELDS + FEATURE_COLUMNS``.
+    """
+    n = len(dates)  # Anzahl Handelstage
+    rf = risk_free_annual.reindex(dates).ffill().to_numpy(dtype=np.float64)  # fehlende Tage vorwärts füllen
+    day_idx = pd.DatetimeIndex(dates).asi8 // 86_400_000_000_000  # ns → ganze Tage (int64)
+    days_to_next = np.ones(n, dtype=np.int64)  # letzter Tag: Abstand 1
+    days_to_next[:-1] = np.diff(day_idx)  # Abstand zum nächsten Handelstag
+
+    factor = 1.0 + rf * (days_to_next / float(day_count))  # einfache Verzinsung pro Intervall
+    if n:
+        factor[-1] = 1.0  # letzter Tag hat keinen Folgetag
+
+    close = np.nancumprod(factor)  # kumulative Verzinsung als Schlusskurs (NaN überspringen …)
+    close[np.isnan(factor)] = np.nan  # … aber an NaN-Tagen NaN ausweisen (wie ``Series.cumprod``)
+    open_ = np.ones(n)  # Open = Close des Vortags, Startwert 1.0
+    open_[1:] = close[:-1]
+    open_[np.isnan(open_)] = 1.0  # Startwert bzw. Lücken mit 1.0
+
+    # Ein einziger float32-Puffer im CLEAN-Schema; TA-Features bleiben NaN (nicht sinnvoll für CASH)
+    cols = RAW_FIELDS + FEATURE_COLUMNS
+    buf = np.full((n, len(cols)), np.nan, dtype=np.float32)
+    pos = {c: i for i, c in enumerate(cols)}  # Spaltenname → Slot
+    buf[:, pos["open"]] = open_  # synthetischer Eröffnungskurs
+    buf[:, pos["high"]] = np.maximum(open_, close)  # Tageshoch: Max aus Open/Close
+    buf[:, pos["low"]] = np.minimum(open_, close)  # Tagestief: Min aus Open/Close
+    buf[:, pos["close"]] = close  # Schlusskurs
+    buf[:, pos["adj_close"]] = close  # identisch mangels Splits
+    buf[:, pos["volume"]] = 0.0  # kein Handelsvolumen
+    buf[:, pos["dividends"]] = 0.0  # keine Dividenden
+    buf[:, pos["stock_splits"]] = 1.0  # keine Splits
+    buf[:, pos["daily_return_log"]] = np.log(factor)  # log. Tagesrendite
+    buf[:, pos["average_dollar_volume_20"]] = 0.0  # Liquidität irrelevant
+    buf[:, pos["volatility_becker_parkinson"]] = 0.0  # Volatilität = 0
+    buf[:, pos["bid_ask_spread_corwin_schultz"]] = 0.0  # Spread = 0
+    buf[:-1, pos["execution_price_t_plus_1_open"]] = open_[1:]  # Ausführungspreis nächster Tag
+    return buf
 
 
 def _build_cash_asset(
@@ -93,59 +275,13 @@ def _build_cash_asset(
     pd.DataFrame
         Preis- und Feature-Schema für das CASH-Asset.
     """
-    rf = risk_free_annual.reindex(dates).ffill()  # fehlende Tage vorwärts füllen
-    date_series = pd.Series(pd.to_datetime(dates), index=pd.to_datetime(dates))  # Hilfsserie mit Tagesabständen
-    days_to_next = (date_series.shift(-1) - date_series).dt.days.fillna(1).astype(int)  # Abstand zum nächsten Handelstag
-
-    factor = 1.0 + rf * (days_to_next / float(day_count))  # einfache Verzinsung pro Intervall
-    factor.iloc[-1] = 1.0  # letzter Tag hat keinen Folgetag
-
-    close = factor.cumprod().astype("float64")  # kumulative Verzinsung als Schlusskurs
-    open_ = close.shift(1).fillna(1.0)  # Open = Close des Vortags, Startwert 1.0
-    high = np.maximum(open_.values, close.values)  # Tageshoch: Max aus Open/Close
-    low = np.minimum(open_.values, close.values)   # Tagestief: Min aus Open/Close
-
     df_cash = pd.DataFrame(
-        {
-            # Rohschema beibehalten
-            "open": open_.values,                          # synthetischer Eröffnungskurs
-            "high": high,                                  # Tageshoch
-            "low": low,                                    # Tagestief
-            "close": close.values,                         # Schlusskurs
-            "adj_close": close.values,                     # identisch mangels Splits
-            "volume": 0.0,                                # kein Handelsvolumen
-            "dividends": 0.0,                             # keine Dividenden
-            "stock_splits": 1.0,                          # keine Splits
-            # Core-Features
-            "daily_return_log": np.log(factor.values),    # log. Tagesrendite
-            "average_dollar_volume_20": 0.0,              # Liquidität irrelevant
-            "volatility_becker_parkinson": 0.0,           # Volatilität = 0
-            "bid_ask_spread_corwin_schultz": 0.0,         # Spread = 0
-            # TA-Features: nicht sinnvoll für CASH
-            "simple_moving_average_20": np.nan,           # Indikatoren bleiben NaN
-            "simple_moving_average_60": np.nan,
-            "exponential_moving_average_12": np.nan,
-            "exponential_moving_average_26": np.nan,
-            "relative_strength_index_14": np.nan,
-            "macd_line_12_26_9": np.nan,
-            "macd_signal_12_26_9": np.nan,
-            "macd_histogram_12_26_9": np.nan,
-            "bollinger_middle_band_20_2.0": np.nan,
-            "bollinger_upper_band_20_2.0": np.nan,
-            "bollinger_lower_band_20_2.0": np.nan,
-            "bollinger_bandwidth_20_2.0": np.nan,
-            "commodity_channel_index_20": np.nan,
-            "average_directional_index_14": np.nan,
-            "positive_directional_index_14": np.nan,
-            "negative_directional_index_14": np.nan,
-            # Exec/Flag
-            "execution_price_t_plus_1_open": open_.shift(-1).values,  # Ausführungspreis nächster Tag
-            "is_cash": 1,                                            # Kennzeichnung als CASH
-        },
-        index=dates,
+        _cash_values(dates, risk_free_annual, day_count),
+        index=pd.MultiIndex.from_product([dates, [symbol]], names=["date", "asset"]),  # direkt (date, asset)
+        columns=list(RAW_FIELDS + FEATURE_COLUMNS),
     )
-    df_cash["asset"] = symbol  # Spalte für Assetnamen hinzufügen
-    return df_cash.reset_index().set_index(["date", "asset"])  # MultiIndex herstellen
+    df_cash["is_cash"] = np.int8(1)  # Kennzeichnung als CASH
+    return df_cash  # CASH-Zeilen mit MultiIndex
 
 
 def build_clean_data(
@@ -154,6 +290,7 @@ def build_clean_data(
     out_path: Optional[str] = None,
     cash_symbol: str = "CASH",
     cs_sample_length: int = 1,   # Corwin–Schultz: Spanne (typisch 1–2)
+    n_jobs: Optional[int] = None,  # Threads für Asset-Blöcke (None = alle Kerne)
  ) -> pd.DataFrame:
     """Feature-Panel mit technischen Kennzahlen und CASH-Asset erzeugen.
 
@@ -169,6 +306,9 @@ def build_clean_data(
         Tickersymbol für das synthetische Cash.
     cs_sample_length : int
         Fenster für Corwin–Schultz-Spread-Schätzung.
+    n_jobs : int | None
+        Anzahl Threads für die Feature-Berechnung je Asset-Block;
+        ``None`` nutzt alle Kerne (höchstens ein Block je Asset).
 
     Returns
     -------
@@ -178,98 +318,92 @@ def build_clean_data(
     # Input-Checks
     if not isinstance(prices.index, pd.MultiIndex) or prices.index.names != ["date", "asset"]:
         raise ValueError("prices muss MultiIndex mit Indexnamen ['date','asset'] besitzen.")
-    if cash_symbol in prices.index.get_level_values("asset"):
-        raise ValueError(f"Input darf {cash_symbol} noch nicht enthalten.")
-
-    prices = prices.sort_index()  # sicherstellen, dass Daten zeitlich sortiert sind
-    frames = []  # Sammelliste für Asset-DataFrames
-
-    # --- Nicht-CASH Assets ---
-    for asset, df_asset in prices.groupby(level="asset", sort=False):  # iteriere je Asset
-        px = df_asset.droplevel("asset").sort_index()  # reine Ein-Asset-Serie
-
-        # Core-Features
-        daily_ret = returns(px["close"], kind="log")  # logarithmische Renditen
-        adv20 = average_dollar_volume(px["close"], px["volume"], window=20)  # Liquidität
-
-        beta = corwin_schultz_beta(px["high"], px["low"], sample_length=cs_sample_length)  # Spread-Proxies
-        gamma = corwin_schultz_gamma(px["high"], px["low"])
-        sigma_bp = becker_parkinson_sigma(beta, gamma)  # Volatilität aus High/Low
-
-        alpha = corwin_schultz_alpha(beta, gamma)
-        spread_cs = corwin_schultz_spread(alpha)  # Bid-Ask-Spread-Schätzung
-
-        # TA-Features
-        sma20 = simple_moving_average(px["close"], 20)  # kurzfristiger Trend
-        sma60 = simple_moving_average(px["close"], 60)  # längerfristiger Trend
-        ema12 = exponential_moving_average(px["close"], 12)  # schnell reagierend
-        ema26 = exponential_moving_average(px["close"], 26)  # träge EMA
-        rsi14 = relative_strength_index(px["close"], 14)  # Momentummaß
-        macd_line, macd_signal, macd_hist = moving_average_convergence_divergence(px["close"], 12, 26, 9)
-        boll_mid, boll_up, boll_lo, boll_bw = bollinger(px["close"], 20, 2.0)  # Bollinger-Bänder
-        cci20 = commodity_channel_index(px["high"], px["low"], px["close"], 20)
-        adx_df = average_directional_index(px["high"], px["low"], px["close"], 14)
-
-        exec_ref = px["open"].shift(-1)  # Preis für t+1-Ausführung
-
-        features = pd.DataFrame(
-            {
-                # Rohschema
-                "open": px["open"],  # Eröffnungskurs
-                "high": px["high"],  # Tageshoch
-                "low": px["low"],    # Tagestief
-                "close": px["close"],  # Schlusskurs
-                "adj_close": px["adj_close"],  # bereinigter Kurs
-                "volume": px["volume"].astype("float64"),  # Handelsvolumen
-                "dividends": px["dividends"],  # ausgezahlte Dividenden
-                "stock_splits": px["stock_splits"],  # Splitfaktor
-
-                # Core
-                "daily_return_log": daily_ret,  # log Rendite
-                "average_dollar_volume_20": adv20,  # ADV20
-                "volatility_becker_parkinson": sigma_bp,  # Volatilitätsmaß
-                "bid_ask_spread_corwin_schultz": spread_cs,  # Spread-Schätzung
-
-                # Technische Indikatoren
-                "simple_moving_average_20": sma20,
-                "simple_moving_average_60": sma60,
-                "exponential_moving_average_12": ema12,
-                "exponential_moving_average_26": ema26,
-                "relative_strength_index_14": rsi14,
-                "macd_line_12_26_9": macd_line,
-                "macd_signal_12_26_9": macd_signal,
-                "macd_histogram_12_26_9": macd_hist,
-                "bollinger_middle_band_20_2.0": boll_mid,
-                "bollinger_upper_band_20_2.0": boll_up,
-                "bollinger_lower_band_20_2.0": boll_lo,
-                "bollinger_bandwidth_20_2.0": boll_bw,
-                "commodity_channel_index_20": cci20,
-                "average_directional_index_14": adx_df["adx_14"],
-                "positive_directional_index_14": adx_df["plus_di_14"],
-                "negative_directional_index_14": adx_df["minus_di_14"],
-
-                # Exec/Flag
-                "execution_price_t_plus_1_open": exec_ref,  # für Simulation t+1
-                "is_cash": 0,
-            },
-            index=px.index,
-        )
-        features["asset"] = asset  # Asset-Kennung hinzufügen
-        frames.append(features.reset_index().set_index(["date", "asset"]))  # wieder MultiIndex
+    asset_level = prices.index.levels[1]  # eindeutige Asset-Werte, ohne Zeilen zu materialisieren
+    if cash_symbol in asset_level and (prices.index.codes[1] == asset_level.get_loc(cash_symbol)).any():
+        raise ValueError(f"Input darf {cash_symbol} noch nicht enthalten.")  # Level kann ungenutzte Werte halten
+
+    if not prices.index.is_monotonic_increasing:  # INTERIM ist i. d. R. bereits sortiert
+        prices = prices.sort_index()  # sicherstellen, dass Daten zeitlich sortiert sind
+
+    # --- Gitter Datum × Asset; CASH als zusätzliche Spalte an sortierter Position ---
+    wide = _wide_fields(prices)  # je Feld eine Matrix (Duplikate → ValueError)
+    dates, assets = wide["close"].index, wide["close"].columns  # sortierte Achsen des Gitters
+    cash_pos = int(assets.searchsorted(cash_symbol))  # Einfügeposition hält die Asset-Achse sortiert
+    grid_assets = assets.insert(cash_pos, cash_symbol)
+    n_raw = len(RAW_FIELDS)
+    n_cols = n_raw + len(FEATURE_COLUMNS)
+    # Ein Ausgabepuffer im CLEAN-Schema, spaltenweise abgelegt: jede Spalte ist ein
+    # zusammenhängender Block, den pandas ohne Kopie als float32-Block übernimmt
+    store = np.empty((n_cols, len(dates), len(grid_assets)), dtype=np.float32)
+    buf = store.transpose(1, 2, 0)  # Sicht (Datum, Asset, Spalte) zum Befüllen per Slot
+
+    # --- Nicht-CASH Assets (Asset-Blöcke parallel, nie über die CASH-Spalte hinweg) ---
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(assets)))  # nie mehr Worker als Assets
+    cuts = {0, cash_pos, len(assets)} | {int(ix[0]) for ix in np.array_split(np.arange(len(assets)), n_jobs) if len(ix)}
+    cuts = sorted(cuts)
+    blocks = [slice(a, b) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+    # Lückenhaftes Panel: welche (Datum, Asset)-Zeilen existieren im Input?
+    present = None
+    if len(prices) != len(dates) * len(assets):
+        present = np.zeros((len(dates), len(assets)), dtype=bool)
+        present[dates.get_indexer(prices.index.get_level_values("date")),
+                assets.get_indexer(prices.index.get_level_values("asset"))] = True
+    feat_fields = ("open", "high", "low", "close", "volume")
+
+    def _run(sl: slice) -> None:  # Block = zusammenhängende Asset-Spalten
+        shift = int(sl.start >= cash_pos)  # hinter CASH um eine Spalte versetzt
+        out = buf[:, sl.start + shift:sl.stop + shift]  # disjunkter Pufferbereich des Blocks
+        for k, c in enumerate(RAW_FIELDS):
+            out[:, :, k] = wide[c].iloc[:, sl].to_numpy()  # Rohfelder vorn
+        own = None if present is None else present[:, sl]
+        if own is None or own.all():  # volles Gitter: ganzer Block in einem Durchlauf
+            block = {c: wide[c].iloc[:, sl] for c in feat_fields}
+            _asset_features(block, out[:, :, n_raw:], cs_sample_length)
+            return
+        # Assets mit Lücken: Fenster/Verschiebungen über die eigenen Zeilen, nicht über das NaN-Gitter
+        dense = np.flatnonzero(own.all(axis=0))
+        if len(dense):  # lückenlose Assets weiterhin gemeinsam
+            tmp = np.empty((len(dates), len(dense), len(FEATURE_COLUMNS)), dtype=np.float32)
+            _asset_features({c: wide[c].iloc[:, sl].iloc[:, dense] for c in feat_fields}, tmp, cs_sample_length)
+            out[:, dense, n_raw:] = tmp
+        for j in np.flatnonzero(~own.all(axis=0)):
+            rows = np.flatnonzero(own[:, j])  # nur die eigenen Handelstage des Assets
+            tmp = np.empty((len(rows), 1, len(FEATURE_COLUMNS)), dtype=np.float32)
+            _asset_features({c: wide[c].iloc[rows, [sl.start + j]] for c in feat_fields}, tmp, cs_sample_length)
+            out[:, j, n_raw:] = np.nan  # Füllzeilen (werden am Ende verworfen)
+            out[rows, j, n_raw:] = tmp[:, 0]
+
+    if n_jobs == 1:
+        for sl in blocks:
+            _run(sl)  # kein Thread-Overhead
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as ex:
+            list(ex.map(_run, blocks))  # Ausnahmen der Worker weiterreichen
 
     # --- CASH Asset ---
-    dates = prices.index.get_level_values(0).unique().sort_values()  # verfügbare Handelstage
-    cash_df = _build_cash_asset(dates, risk_free_annual, day_count=360, symbol=cash_symbol)  # Kunst-Asset
-    frames.append(cash_df)
-
-    # --- Zusammenführen, Finalisieren ---
-    panel = pd.concat(frames).sort_index()  # alles zusammenführen
-    panel = panel[~panel.index.duplicated(keep="last")]  # doppelte Zeilen entfernen
+    buf[:, cash_pos] = _cash_values(dates, risk_free_annual, day_count=360)  # Kunst-Asset
+    is_cash = np.zeros((len(dates), len(grid_assets)), dtype=np.int8)
+    is_cash[:, cash_pos] = 1  # Kennzeichnung als CASH
+
+    # --- Finalisieren: Gitter ist bereits (date, asset)-sortiert und eindeutig ---
+    panel = pd.DataFrame(
+        store.reshape(n_cols, -1).T,  # Zeilen date-major, Spalten als zusammenhängende Blöcke
+        index=pd.MultiIndex.from_product([dates, grid_assets], names=["date", "asset"]),
+        columns=list(RAW_FIELDS + FEATURE_COLUMNS),
+        copy=False,  # Puffer direkt übernehmen, keine Achsenausrichtung
+    )
+    panel["is_cash"] = is_cash.ravel()
+    if present is not None:  # Lücken im INTERIM: nur Input-Zeilen plus CASH behalten
+        keep = np.zeros(len(panel), dtype=bool)
+        keep[panel.index.get_indexer(prices.index)] = True
+        keep[cash_pos::len(grid_assets)] = True  # CASH an jedem Tag
+        panel = panel[keep]
     panel = _downcast_feature_dtypes(panel)  # Datentypen optimieren
 
     # Optional speichern
     if out_path:
-        save_parquet(panel, out_path)  # persistieren
+        save_parquet_chunked(panel, out_path)  # persistieren, eine Row Group je Jahr
 
     return panel  # Feature-Panel zurückgeben
 
@@ -297,7 +431,7 @@ def write_clean_manifest(
     payload = {
         "stage": "clean",  # Pipeline-Stufe
         "dataset_id": spec.get("feature_version", "v1"),  # Versionierung
-        "created_at": pd.Timestamp.utcnow().isoformat(),  # Zeitstempel
+        "created_at": pd.Timestamp.now(tz="UTC").isoformat(),  # Zeitstempel (``utcnow`` ist veraltet)
         "git_commit": current_commit_short(),  # Referenz aufs Repo
         "calendar": spec.get("align", {}).get("calendar", "XNYS"),  # verwendeter Kalender
         "spec": {
@@ -310,8 +444,8 @@ def write_clean_manifest(
         "inputs": [file_summary(str(interim_path)), file_summary(str(macro_path))],  # Quellen
         "outputs": [file_summary(str(out_path))],  # erzeugte Dateien
         "env": {
-            "python": platform.python_version(),
-            "pandas": pd.__version__,
+            "python": _PYVER,
+            "pandas": _PDVER,
         },
     }
     write_manifest(payload, str(manifest_path))  # JSON auf Platte schreiben
@@ -1,6 +1,7 @@
 # Dieses Modul kombiniert RAW-Parquet-Dateien zu einem konsistenten Preis-Panel.
 # Pipeline-Einordnung: RAW → INTERIM, dient als sauberer Zwischenschritt für Features.
-# Hauptfunktion: `build_interim_prices`; Hilfsfunktionen zur Spalten- und Indexnormierung.
+# Hauptfunktion: `build_interim_prices` (lädt Assets parallel über `_load_one`);
+# Hilfsfunktionen zur Spalten- und Indexnormierung.
 # Eingaben: Asset-Liste, Zeitraum (`start`/`end`), optionale Spezifikation und Krypto-Set.
 # Ausgaben: DataFrame mit MultiIndex `(date, asset)`; optional Speicherung auf `INTERIM_PANEL`.
 # Abhängigkeiten: `pandas`, Handelskalender/Align-Helper, Parquet-IO.
@@ -15,14 +16,20 @@ Zeitzonenfehler bei den Rohdaten.
 """
 
 from __future__ import annotations  # erlaubt Vorwärtsreferenzen bei Typen
+from concurrent.futures import ThreadPoolExecutor  # parallele RAW-Ladevorgänge
+from functools import partial  # feste Parameter für Worker-Funktion
 from typing import Optional, Sequence, Set, Dict  # Typinformationen für Argumente
 
+import numpy as np  # Gitter-Puffer für das Panel
 import pandas as pd  # zentrale Datenstruktur (DataFrame)
 
 from src.data.calendar import nyse_trading_days  # Handelskalender für NYSE-Sessions
 from src.data.align import align_to_trading_days, resample_crypto_last  # Index-Helfer für Ausrichtung
-from src.utils.paths import INTERIM_PANEL  # Zielpfad für das resultierende Panel
-from src.utils.parquet_io import load_parquet, save_parquet  # Parquet-Ein-/Ausgabe
+from src.utils.paths import INTERIM_PANEL, raw_asset_path  # Zielpfad Panel, RAW-Pfad je Asset
+from src.utils.parquet_io import load_parquet, save_parquet_chunked, parquet_column_types  # Parquet-Ein-/Ausgabe
+from src.utils.helpers import get_logger  # einheitliches Projekt-Logging
+
+_LOG = get_logger()  # Warnungen zu auffälligen RAW-Daten
 
 # Mapping Provider → kanonisch (nur in INTERIM anwenden)
 PROVIDER_TO_CANONICAL = {
@@ -38,27 +45,119 @@ DEFAULT_SPEC: Dict[str, object] = {
     "calendar": "XNYS",  # Standardkalender: NYSE
 }
 
-def _sanitize(s: str) -> str:  # Hilfsfunktion zur Normalisierung einzelner Namen
-    """Spaltennamen vereinheitlichen (Kleinbuchstaben, Unterstrich)."""
-    return str(s).strip().replace(" ", "_").replace("-", "_").lower()  # einfache Normalisierung
+# Felder mit geringer Präzisionsanforderung → float32 (halbe Bytes im Speicher und auf Platte);
+# Preise bleiben float64 (Renditen/Indikatoren aus Differenzen), ebenso ``volume`` (float32 ist nur
+# bis 2^24 ganzzahlig exakt, ETF-Volumina liegen darüber) und ``dividends`` (Beträge in Cent)
+COMPACT_FIELDS: Dict[str, np.dtype] = {
+    "stock_splits": np.dtype(np.float32),  # meist 1.0, wenige signifikante Stellen
+}
+
+def _canonical_columns(columns) -> pd.Index:  # Spaltennamen in einem Durchlauf normalisieren
+    """Spaltennamen vereinheitlichen (Kleinbuchstaben, Unterstrich) und auf kanonische Namen mappen."""
+    names = pd.Index(columns).astype(str).str.strip().str.replace(r"[ \-]", "_", regex=True).str.lower()
+    return names.map(lambda c: PROVIDER_TO_CANONICAL.get(c, c))  # Provider → kanonisch (Dict-Lookup)
 
 def _standardize_columns(df: pd.DataFrame) -> pd.DataFrame:  # Spaltennamen harmonisieren
-    """Spalten auf kanonische Namen mappen."""
-    df = df.copy()  # Original unverändert lassen
-    # Dict-Comprehension: vorhandene Spalten über PROVIDER_TO_CANONICAL auf Standardnamen abbilden
-    df.rename(columns={c: PROVIDER_TO_CANONICAL.get(_sanitize(c), _sanitize(c)) for c in df.columns}, inplace=True)
-    return df  # zurückgeben des normierten Frames
+    """Spalten auf kanonische Namen mappen (neue Hülle, Daten werden nicht kopiert)."""
+    return df.set_axis(_canonical_columns(df.columns), axis=1, copy=False)
 
 def _to_datetime_index(df: pd.DataFrame) -> pd.DataFrame:  # konvertiert Datumsspalte in Index
     """Datumsspalte in Index umwandeln (tz-naiv)."""
-    df = df.copy()  # keine Mutationen am Eingabe-DataFrame
     if "date" in df.columns:  # nur falls Spalte vorhanden
-        dt = pd.to_datetime(df["date"], errors="coerce", utc=True).dt.tz_localize(None)  # parse + tz entfernen
-        df = df.drop(columns=["date"])  # Originalspalte entfernen
-        df.index = dt  # Datumswerte werden Index
-        df.index.name = "date"  # Index benennen
+        dt = df["date"]
+        if isinstance(dt.dtype, pd.DatetimeTZDtype):  # Parquet-Timestamp mit tz → UTC-Wandzeit, ohne Parsen
+            dt = dt.dt.tz_convert(None)
+        elif not pd.api.types.is_datetime64_dtype(dt):  # Strings/Objekte: langsamer Parse-Pfad
+            dt = pd.to_datetime(dt, errors="coerce", utc=True).dt.tz_localize(None)  # parse + tz entfernen
+        df = df.copy(deep=False)  # flache Kopie: Eingabe bleibt unverändert, Datenblöcke werden geteilt
+        del df["date"]  # Originalspalte entfernen (``drop`` würde alle Spalten kopieren)
+        df.index = pd.DatetimeIndex(dt, name="date")  # Datumswerte werden Index
     return df  # DataFrame mit Datumsindex zurückgeben
 
+def _load_one(
+    asset: str,
+    start: str,
+    end: str,
+    cal_idx: pd.DatetimeIndex,
+    fields: Sequence[str],
+    require_base: bool,
+    base_fields: Set[str],
+    crypto_assets: Set[str],
+) -> pd.DataFrame:
+    """Ein RAW-Parquet laden, normalisieren und auf den Kalender ausrichten.
+
+    Unabhängig je Asset (eigene Datei, kein geteilter Zustand), daher in
+    Threads ausführbar; Parquet-Dekodierung gibt die GIL frei.
+
+    Returns
+    -------
+    pd.DataFrame
+        Ausgerichtete Zeilen des Assets (Index = ``cal_idx``).
+    """
+    f = raw_asset_path(asset)  # Pfad zur RAW-Datei bestimmen
+    if not f.exists():  # Datei muss vorhanden sein
+        raise FileNotFoundError(f"RAW file not found: {f}.")  # frühzeitiger Abbruch
+    start_date = pd.to_datetime(start); end_date = pd.to_datetime(end)  # Grenzen in datetime umwandeln
+
+    # Projektion: nur Spalten dekodieren, die nach dem Mapping in ``fields`` landen (plus Datum)
+    types = parquet_column_types(f)  # nur Footer, keine Daten
+    wanted = set(fields) | {"date"}
+    columns = [c for c, canon in zip(types, _canonical_columns(list(types))) if canon in wanted]
+    # Prädikat: Row-Group-Pruning nur bei typisiertem Zeitstempel (Tiingo liefert ISO-Strings)
+    filters = None
+    if types.get("date", "").startswith("timestamp"):
+        tz = "UTC" if "tz=" in types["date"] else None  # Grenzen passend zur gespeicherten Zeitzone
+        lo = start_date.tz_localize(tz) if tz else start_date
+        hi = end_date.tz_localize(tz) if tz else end_date
+        filters = [("date", ">=", lo), ("date", "<=", hi)]
+    raw = load_parquet(f, columns=columns, filters=filters)  # RAW unverändert (date ist Spalte)
+
+    # Normalisieren (Datum wird genau einmal geparst)
+    df = _standardize_columns(raw)  # Spaltennamen vereinheitlichen
+    df = _to_datetime_index(df)  # Datumsspalte → Index
+
+    # Fenster schneiden (tz-naiv); exakter Zeilenfilter, Pushdown verwirft nur ganze Row Groups
+    if isinstance(df.index, pd.DatetimeIndex):  # nur falls Datumsspalte existierte
+        if df.index.hasnans:
+            df = df[df.index.notna()]  # unparsebare Daten fallen wie bisher heraus
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind="stable")  # Binärsuche braucht sortierten Index; stabil → Dateireihenfolge bei Gleichstand
+        df = df.loc[start_date:end_date]  # Timestamp-Grenzen: inklusiv, ohne Teilstring-Semantik
+        i8 = df.index.asi8  # sortierte Zeitstempel als int64 (ohne Kopie)
+        dup = i8[1:] == i8[:-1]  # Duplikate liegen nach dem Sortieren nebeneinander
+        if dup.any():  # doppelt gelieferte Tage: letzte Zeile gewinnt (ohne Hashing)
+            _LOG.warning("[%s] %d duplicate RAW dates dropped (last row wins): %s", asset, int(dup.sum()), f)
+            df = df[np.append(~dup, True)]
+
+    # Feldauswahl
+    keep = [c for c in fields if c in df.columns]  # nur benötigte Spalten behalten
+    df = df.reindex(columns=keep, copy=False)  # eigenes Frame (kein SettingWithCopy); ohne Kopie, wenn die Projektion schon passt
+
+    # Basisspalten-Policy
+    if require_base:  # Validierung aktiv
+        missing = [c for c in base_fields if c not in df.columns]  # fehlende OHLC-Felder sammeln
+        if missing:
+            raise ValueError(f"[{asset}] Missing base fields after mapping: {missing}")  # harte Fehlermeldung
+
+    # sinnvolle Defaults nur falls in fields verlangt
+    if "adj_close" in fields and "adj_close" not in df.columns and "close" in df.columns:
+        df["adj_close"] = df["close"]  # Fallback: adj_close = close
+    if "dividends" in fields and "dividends" not in df.columns:
+        df["dividends"] = 0.0  # fehlende Dividenden auffüllen
+    if "stock_splits" in fields and "stock_splits" not in df.columns:
+        df["stock_splits"] = 1.0  # neutraler Split-Faktor
+    if "volume" in fields and "volume" not in df.columns:
+        df["volume"] = 0.0  # fehlendes Volumen = 0
+
+    # Align/Downsample
+    is_crypto = (asset.upper() in crypto_assets) or asset.upper().endswith("USD")  # heuristische Krypto-Erkennung
+    if is_crypto:
+        df = resample_crypto_last(df, cal_idx)  # 7-Tage-Krypto → Handelstage (last)
+    else:
+        df = align_to_trading_days(df, cal_idx)  # Equities hart auf Handelstage
+    return df  # Asset-Zuordnung ergibt sich aus der Position im Gitter
+
+
 def build_interim_prices(
     assets: Sequence[str],  # Liste der zu verarbeitenden Symbole
     start: str,  # Startdatum des Betrachtungsfensters
@@ -67,6 +166,7 @@ def build_interim_prices(
     crypto_assets: Optional[Set[str]] = None,  # Menge an Krypto-Tickern
     sessions: Optional[pd.DatetimeIndex] = None,  # vorberechneter Kalender
     save: bool = True,  # Ergebnis schreiben?
+    n_jobs: Optional[int] = None,  # Threads für RAW-Dateien (None = bis zu 16)
 ) -> pd.DataFrame:  # Rückgabe: Panel-DataFrame
     """RAW-Parquets zu einem kalendarisch ausgerichteten Panel kombinieren.
 
@@ -84,6 +184,8 @@ def build_interim_prices(
         Vorberechneter Kalender; falls ``None`` wird NYSE genutzt.
     save : bool
         Ob das Ergebnis nach ``INTERIM_PANEL`` geschrieben wird.
+    n_jobs : int | None
+        Anzahl Threads zum Laden der RAW-Dateien; ``None`` nutzt bis zu 16.
 
     Returns
     -------
@@ -100,58 +202,39 @@ def build_interim_prices(
     base_fields = set(cfg.get("base_fields", ["open", "high", "low", "close"]))  # Set für schnelle Prüfung
     crypto_assets = {a.upper() for a in (crypto_assets or set())}  # Krypto-Ticker normalisieren
 
-    frames = []  # gesammelt je Asset-DataFrame
-    for asset in assets:  # Schleife über alle Assets
-        from utils.paths import raw_asset_path  # lazy import, vermeidet Zyklen
-        f = raw_asset_path(asset)  # Pfad zur RAW-Datei bestimmen
-        if not f.exists():  # Datei muss vorhanden sein
-            raise FileNotFoundError(f"RAW file not found: {f}.")  # frühzeitiger Abbruch
-        raw = load_parquet(f)  # RAW unverändert (date ist Spalte)
-
-        # Fenster schneiden (tz-naiv)
-        if "date" in raw.columns:  # nur falls Datumsspalte existiert
-            date = pd.to_datetime(raw["date"], errors="coerce", utc=True).dt.tz_localize(None)  # parse & tz entfernen
-            start_date = pd.to_datetime(start); end_date = pd.to_datetime(end)  # Grenzen in datetime umwandeln
-            raw = raw.loc[(date >= start_date) & (date <= end_date)]  # Filter auf Zeitfenster
-
-        # Normalisieren
-        df = _standardize_columns(raw)  # Spaltennamen vereinheitlichen
-        df = _to_datetime_index(df)  # Datumsspalte → Index
-
-        # Feldauswahl
-        keep = [c for c in fields if c in df.columns]  # nur benötigte Spalten behalten
-        df = df[keep].copy()  # Slice kopieren (Avoid SettingWithCopy)
-
-        # Basisspalten-Policy
-        if require_base:  # Validierung aktiv
-            missing = [c for c in base_fields if c not in df.columns]  # fehlende OHLC-Felder sammeln
-            if missing:
-                raise ValueError(f"[{asset}] Missing base fields after mapping: {missing}")  # harte Fehlermeldung
-
-        # sinnvolle Defaults nur falls in fields verlangt
-        if "adj_close" in fields and "adj_close" not in df.columns and "close" in df.columns:
-            df["adj_close"] = df["close"]  # Fallback: adj_close = close
-        if "dividends" in fields and "dividends" not in df.columns:
-            df["dividends"] = 0.0  # fehlende Dividenden auffüllen
-        if "stock_splits" in fields and "stock_splits" not in df.columns:
-            df["stock_splits"] = 1.0  # neutraler Split-Faktor
-        if "volume" in fields and "volume" not in df.columns:
-            df["volume"] = 0.0  # fehlendes Volumen = 0
-
-        # Align/Downsample
-        is_crypto = (asset.upper() in crypto_assets) or asset.upper().endswith("USD")  # heuristische Krypto-Erkennung
-        if is_crypto:
-            df = resample_crypto_last(df, cal_idx)  # 7-Tage-Krypto → Handelstage (last)
-        else:
-            df = align_to_trading_days(df, cal_idx)  # Equities hart auf Handelstage
-
-        df["asset"] = asset  # Asset-Kennung als Spalte
-        frames.append(df)  # DataFrame in Liste aufnehmen
-
-    out = pd.concat(frames, axis=0)  # alle Assets untereinander stapeln
-    out = out.set_index("asset", append=True).sort_index()  # MultiIndex aufbauen & sortieren
-    out.index.set_names(["date", "asset"], inplace=True)  # Indexebenen benennen
+    load = partial(
+        _load_one, start=start, end=end, cal_idx=cal_idx, fields=fields,
+        require_base=require_base, base_fields=base_fields, crypto_assets=crypto_assets,
+    )
+    n_jobs = max(1, min(n_jobs or 16, len(assets)))  # I/O-gebunden: bis zu 16 Dateien gleichzeitig
+    if n_jobs == 1:
+        frames = [load(asset) for asset in assets]  # kein Thread-Overhead
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as ex:
+            frames = list(ex.map(load, assets))  # Reihenfolge bleibt erhalten, Fehler werden weitergereicht
+
+    # Blockweise Konstruktion: alle Frames liegen exakt auf ``cal_idx`` → Gitter (Datum × Asset)
+    # direkt befüllen, statt zu stapeln, einen MultiIndex anzuhängen und neu zu sortieren
+    order = sorted(range(len(frames)), key=lambda i: assets[i])  # Asset-Achse wie nach ``sort_index``
+    cols = list(dict.fromkeys(c for df in frames for c in df.columns))  # Vereinigung, Reihenfolge wie concat
+    data = {}
+    for c in cols:
+        parts = [frames[i][c].to_numpy() if c in frames[i].columns else None for i in order]
+        dtypes = [p.dtype for p in parts if p is not None]
+        if len(dtypes) < len(parts):
+            dtypes.append(np.dtype(np.float64))  # NaN-Auffüllung erzwingt Float (wie concat)
+        dtype = np.result_type(*dtypes)
+        if c in COMPACT_FIELDS and dtype.kind in "fiu":  # numerische Niedrigpräzisionsfelder verkleinern
+            dtype = COMPACT_FIELDS[c]
+        block = np.empty((len(cal_idx), len(order)), dtype=dtype)  # Zeilen date-major
+        for j, arr in enumerate(parts):
+            block[:, j] = np.nan if arr is None else arr  # fehlende Spalte → NaN (wie concat)
+        data[c] = block.ravel()
+    out = pd.DataFrame(
+        data,
+        index=pd.MultiIndex.from_product([cal_idx, [assets[i] for i in order]], names=["date", "asset"]),
+    )
 
     if save:  # optionales Speichern
-        save_parquet(out, INTERIM_PANEL)  # Panel persistieren
+        save_parquet_chunked(out, INTERIM_PANEL)  # Panel jahresweise als Row Groups persistieren
     return out  # fertiges Panel zurückgeben
@@ -4,7 +4,7 @@
 # Hauptfunktion: ``nyse_trading_days`` erzeugt ``pd.DatetimeIndex`` zwischen zwei
 #   Daten.
 # Abhängigkeiten: optional ``exchange_calendars`` (mit Feiertagen) ansonsten
-#   Fallback auf ``pandas``-Werktage.
+#   Fallback auf ``numpy``-Werktage (Mo–Fr).
 # Edge Cases: falsche Zeitzonen oder fehlende Kalenderbibliothek.
 # ---------------------------------------------------------------------------
 """
@@ -15,19 +15,28 @@ Werktage zurück (Feiertage werden dann nicht berücksichtigt).
 Typische Fehler: Zeitzonen-Verwechslungen oder fehlende Kalenderbibliothek.
 """
 
-from datetime import datetime  # für Default-Enddatum (heute)
+from datetime import datetime, timezone  # für Default-Enddatum (heute, UTC)
+from functools import lru_cache  # Sessions und Kalenderobjekt nur einmal aufbauen
+from importlib.util import find_spec  # Verfügbarkeit prüfen, ohne zu importieren
+import numpy as np  # Werktagsmaske für den Fallback ohne Kalenderbibliothek
 import pandas as pd  # Index- und Zeitreihenoperationen
 
-# Versuch, die spezialisierte Kalenderbibliothek zu laden
-try:
-    import exchange_calendars as xcals  # externer Kalender mit Feiertagen
-    _CAL_LIB = "exchange_calendars"  # Kennzeichen: Bibliothek verfügbar
-except ImportError:  # falls Import scheitert, auf Fallback verweisen
-    _CAL_LIB = None  # spätere Funktion verwendet einfache Werktage
+# Spezialisierte Kalenderbibliothek nur vormerken; der (teure) Import erfolgt erst beim ersten Kalenderaufruf
+_CAL_LIB = "exchange_calendars" if find_spec("exchange_calendars") else None  # None → einfache Werktage
+
+@lru_cache(maxsize=1)
+def _xnys():
+    """NYSE-Kalenderobjekt einmal je Prozess erzeugen (Import und Feiertagstabellen sind teuer)."""
+    import exchange_calendars as xcals  # externer Kalender mit Feiertagen (lazy)
+    return xcals.get_calendar("XNYS")
 
 def nyse_trading_days(start="2000-01-01", end=None, tz="UTC") -> pd.DatetimeIndex:
     """Handelstage der NYSE zwischen zwei Daten bestimmen.
 
+    Ergebnisse werden je ``(start, end, tz)`` zwischengespeichert; jeder
+    Aufruf erhält eine eigene Kopie, damit gesetzte ``name``/``freq`` nicht
+    auf den Cache und spätere Aufrufer durchschlagen.
+
     Parameters
     ----------
     start : str
@@ -35,26 +44,34 @@ def nyse_trading_days(start="2000-01-01", end=None, tz="UTC") -> pd.DatetimeInde
     end : str | None
         Enddatum; ``None`` bedeutet "heute".
     tz : str
-        Zielzeitzone der Ausgabe (z. B. ``"UTC"``).
+        Zielzeitzone der Ausgabe (z. B. ``"UTC"``).
 
     Returns
     -------
     pd.DatetimeIndex
         Aufsteigend sortierte, zeitzonenbewusste Handelstage.
     """
-    end = end or datetime.utcnow().date().isoformat()  # Default: aktuelles Datum
+    end = end or datetime.now(timezone.utc).date().isoformat()  # Default: aktuelles Datum (vor dem Cache auflösen)
+    return _nyse_trading_days_cached(start, end, tz).copy(deep=True)  # flache Kopie teilte ``freq`` über das Datenarray
+
+@lru_cache(maxsize=32)
+def _nyse_trading_days_cached(start, end, tz) -> pd.DatetimeIndex:
+    """Eigentliche Kalenderberechnung hinter ``nyse_trading_days``."""
     if _CAL_LIB == "exchange_calendars":  # Pfad: spezialisierte Bibliothek verfügbar
-        cal = xcals.get_calendar("XNYS")  # Kalenderobjekt für NYSE anfordern
+        cal = _xnys()  # Kalenderobjekt für NYSE (gecacht)
         # schedule ist ein DataFrame mit market_open & market_close
         sched = cal.schedule.loc[start:end]  # nur gewünschter Zeitraum
-        # Index enthält die Handelstage → auf gewünschte tz normieren
-        days = pd.DatetimeIndex(
-            sched.index.tz_localize("America/New_York").tz_convert(tz).normalize()
-        )
-        return days.unique().sort_values()  # Duplikate entfernen, sortieren
+        # Index enthält die Sessions als tz-naive Kalendertage (eindeutig, sortiert);
+        # ein Cast auf Tagesauflösung ersetzt die Kette localize → convert → normalize
+        days = sched.index.values.astype("datetime64[D]").astype("datetime64[ns]")
+        return pd.DatetimeIndex(days).tz_localize(tz)  # Mitternacht des Handelstags in Ziel-tz
     else:  # Fallback: keine Bibliothek vorhanden
-        # Fallback: einfache Werktage; NYSE-Feiertage fehlen
-        return pd.date_range(start=start, end=end, freq="B", tz=tz)
+        # Fallback: einfache Werktage (Mo–Fr); NYSE-Feiertage fehlen
+        lo = pd.Timestamp(start).to_datetime64().astype("datetime64[D]")
+        hi = pd.Timestamp(end).to_datetime64().astype("datetime64[D]")
+        days = np.arange(lo, hi + 1)  # alle Kalendertage inkl. Ende
+        days = days[np.is_busday(days, weekmask="1111100")]  # ein vektorisierter Werktagstest statt Offset-Iteration
+        return pd.DatetimeIndex(days.astype("datetime64[ns]")).tz_localize(tz)
 
 if __name__ == "__main__":  # kleine Demo bei direktem Aufruf
     idx = nyse_trading_days(start="2019-01-01")  # Handelstage ab 2019 ziehen
@@ -6,16 +6,17 @@
 #   ``assert_non_negative`` prüft Wertebereiche, ``report_gaps`` meldet
 #   fehlende Sessions.
 # Ein-/Ausgabe: pandas-Objekte; Rückgabe meist ``None`` oder Liste von Timestamps.
-# Abhängigkeiten: nur ``pandas``; typische Fehler sind NaNs, Negative oder
+# Abhängigkeiten: ``numpy``, ``pandas``; typische Fehler sind NaNs, Negative oder
 #   nicht eindeutige Indizes.
 # ---------------------------------------------------------------------------
 """
 Kleine Validierungsfunktionen für Preis- und Kalenderdaten.
 Genutzt in der Datenpipeline, um inkonsistente Indizes oder unerwartete Werte
-frühzeitig zu entdecken. Abhängigkeit: ``pandas``.
+frühzeitig zu entdecken. Abhängigkeiten: ``numpy``, ``pandas``.
 Fehlerquellen: doppelte Zeitstempel, negative Preise oder fehlende Handelstage.
 """
 
+import numpy as np  # Mengenvergleich auf int64-Zeitstempeln
 import pandas as pd  # grundlegende Datenstrukturen
 
 def assert_no_dupes(index: pd.Index) -> None:
@@ -27,14 +28,35 @@ def assert_no_dupes(index: pd.Index) -> None:
 def assert_non_negative(df: pd.DataFrame, cols=None) -> None:
     """Sicherstellen, dass ausgewählte Spalten keine negativen Werte enthalten."""
     sub = df if cols is None else df[cols]  # auf relevante Spalten filtern
-    if (sub < 0).any().any():  # Elementweise Prüfung auf Werte < 0
-        bad = sub[(sub < 0).any(axis=1)]  # betroffene Zeilen herausfiltern
-        raise AssertionError(f"Negative Werte gefunden (erste Zeile: {bad.index[0]})")
+    if isinstance(sub, pd.Series):  # einzelne Spalte
+        sub = sub.to_frame()
+    # nur vorzeichenbehaftete Zahlen prüfen: unsigned ist per Typ ≥ 0, Text/Bool/Datum sind keine Beträge
+    kinds = [dt.kind for dt in sub.dtypes]
+    keep = [j for j, k in enumerate(kinds) if k in "if"]
+    if not keep:  # nichts Prüfbares → fertig ohne Datenzugriff
+        return
+    if len(keep) < len(kinds):
+        sub = sub.iloc[:, keep]
+    if all(isinstance(dt, np.dtype) for dt in sub.dtypes):
+        arr = sub.to_numpy()  # ein Block → keine Kopie bei homogenen Spalten
+    else:  # Extension-Dtypes (z. B. ``Int64``): pd.NA → NaN
+        arr = sub.to_numpy(dtype=np.float64, na_value=np.nan)
+    if arr.size == 0:  # keine Zeilen → nichts zu prüfen
+        return
+    mn = np.fmin.reduce(arr, axis=0)  # Spaltenminimum, NaN wird ignoriert (wie ``< 0``)
+    if (mn < 0).any():  # nur im Fehlerfall einzelne Spalten erneut ansehen
+        rows = [int((arr[:, j] < 0).argmax()) for j in np.flatnonzero(mn < 0)]  # erste negative Zeile je Spalte
+        raise AssertionError(f"Negative Werte gefunden (erste Zeile: {sub.index[min(rows)]})")
 
 def report_gaps(index: pd.DatetimeIndex, sessions: pd.DatetimeIndex) -> list[pd.Timestamp]:
     """Fehlende Handelstage im Index melden.
 
     Returns eine Liste der Sessions, die nicht im vorhandenen Index vorkommen.
     """
-    missing = sessions.difference(index)  # set-ähnliche Differenzmenge
-    return list(missing)  # für einfache Weiterverarbeitung in Tests
+    if index.dtype != sessions.dtype:  # abweichende tz/Auflösung → Pandas-Pfad
+        return list(sessions.difference(index))
+    # Vergleich direkt auf den int64-Puffern; Timestamps erst bei der Rückgabe boxen
+    missing = sessions[np.isin(sessions.asi8, index.asi8, invert=True)]
+    if not (missing.is_monotonic_increasing and missing.is_unique):
+        missing = missing.unique().sort_values()  # Semantik von ``difference`` wahren
+    return missing.tolist()  # für einfache Weiterverarbeitung in Tests
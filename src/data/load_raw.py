@@ -1,10 +1,12 @@
 # Dieses Modul lädt Rohpreisdaten über die Tiingo-API und speichert sie als Parquet.
 # Pipeline-Einordnung: Stufe RAW -> unveränderte API-Antworten je Asset persistieren.
 # Hauptfunktionen: `_is_crypto` (Tickerklassifikation), `_load_tiingo` (API-Abfrage),
-# `download_raw_prices` (Batch-Downloader).
+# `_load_tiingo_crypto_batch` (ein Abruf für alle Krypto-Paare), `_raw_covers` (Footer-Abdeckungstest),
+# `download_raw_prices` (Batch-Downloader, wenige Threads mit Ratenlimit).
 # Eingaben: Asset-Ticker, Zeitfenster (`start`, `end`), optionaler API-Schlüssel.
 # Ausgaben: Parquet-Dateien unterhalb des RAW-Verzeichnisses.
-# Abhängigkeiten: `pandas` für DataFrames, `requests` für HTTP, interne Pfad-/IO-Helper.
+# Abhängigkeiten: `pandas` für DataFrames, `requests` für HTTP, interne Pfad-/IO-Helper;
+#   Session und Antwort-Cache aus `src.utils.http_cache`.
 # Edge-Cases: fehlender API-Key, leere oder fehlerhafte Antworten, Netzwerk-Timeouts.
 """
 Download von Rohpreisdaten über die Tiingo‑API und Speichern als Parquet.
@@ -17,19 +19,123 @@ Mögliche Fehler: fehlender API‑Key, leere Antworten oder Netzwerkprobleme.
 from __future__ import annotations  # ermöglicht Vorwärtsreferenzen in Typannotationen
 
 import os  # Zugriff auf Umgebungsvariablen (API-Key)
+import threading  # Sperre für die gemeinsame Ratenbegrenzung
+import time  # Taktung der API-Aufrufe
+from concurrent.futures import ThreadPoolExecutor, as_completed  # Downloads überlappen
+from datetime import date  # offenes vs. abgeschlossenes Zeitfenster
+from pathlib import Path  # Cache-Verzeichnis
 from typing import Iterable, Optional, List  # generische Typunterstützung für Sammlungen
 
 import pandas as pd  # Verarbeitung tabellarischer Daten in DataFrames
 import requests  # HTTP-Anfragen an Tiingo senden
 
-from src.utils.paths import raw_asset_path, _normalize_asset  # Pfad- und Normalisierungs-Helper
+try:
+    import pyarrow as pa  # JSON-Datensätze direkt als Arrow-Tabelle (ohne pandas-Zwischenschritt)
+    import pyarrow.parquet as pq  # Footer-Statistiken vorhandener RAW-Dateien
+    HAVE_PYARROW = True
+except ImportError:  # pragma: no cover - abhängig von der Umgebung
+    HAVE_PYARROW = False
+
+from src.data.calendar import nyse_trading_days  # erwartete erste/letzte Session je Fenster
+from src.utils.paths import raw_asset_path, _normalize_asset, CACHE_DIR  # Pfad- und Normalisierungs-Helper
 from src.utils.parquet_io import save_parquet  # robustes Parquet-Schreiben
+from src.utils.http_cache import SESSION, CACHE_TTL_SEC, cached_get_json  # geteilte Session und Antwort-Cache
+
+TIINGO_CACHE_DIR = CACHE_DIR / "tiingo"  # Antwort-Cache (gzip-JSON je Anfrage)
+
+def _records_frame(rows: list) -> pd.DataFrame:
+    """JSON-Datensätze (Liste von Dicts) ohne Schlüssel-Inferenz je Zeile in ein DataFrame überführen.
+
+    Die Spaltenliste wird einmal vorab bestimmt (Vereinigung in Reihenfolge des
+    Auftretens); Werte und dtypes bleiben wie in der API-Antwort. Mit pyarrow
+    werden die Spalten in C++ aufgebaut (``_records_table``), sonst über
+    ``DataFrame.from_records``.
+    """
+    if HAVE_PYARROW and rows:
+        try:
+            return _records_table(rows).to_pandas()  # spaltenweise statt Zeile für Zeile
+        except (pa.ArrowInvalid, pa.ArrowTypeError):  # gemischte Typen in einer Spalte → pandas-Inferenz
+            pass
+    columns = list(dict.fromkeys(k for r in rows for k in r))  # alle Felder, Reihenfolge wie geliefert
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+def _records_table(rows: list):
+    """JSON-Datensätze direkt in eine Arrow-Tabelle für den RAW-Export überführen.
+
+    Typen werden wie bei ``_records_frame`` aus den Werten abgeleitet (Ganzzahl,
+    Gleitkomma, String); fehlende Schlüssel werden zu Nullwerten. Ohne pyarrow
+    wird das DataFrame geliefert.
+    """
+    if not HAVE_PYARROW:
+        return _records_frame(rows)  # ohne pyarrow: direkt pandas
+    columns = list(dict.fromkeys(k for r in rows for k in r))  # alle Felder, Reihenfolge wie geliefert
+    if rows and columns == list(rows[0]):  # Regelfall: einheitliche Datensätze
+        return pa.Table.from_pylist(rows)  # eine Konvertierung statt JSON → pandas → Arrow
+    # ``from_pylist`` nimmt die Felder nur aus dem ersten Datensatz → spaltenweise aufbauen
+    return pa.table({c: [r.get(c) for r in rows] for c in columns})
 
 def _is_crypto(asset: str) -> bool:  # prüft auf Krypto-Kürzel anhand USD-Suffix
     """Erkennen, ob ein Ticker eine Krypto‑Notation (z. B. ``BTCUSD``) ist."""
     return asset.upper().endswith("USD")  # Krypto-Paare enden typischerweise auf USD
 
-def _load_tiingo(asset: str, start: str, end: str, token: Optional[str] = None) -> pd.DataFrame:  # API-Aufruf pro Asset
+def _auth_headers(token: Optional[str]) -> dict:
+    """Authorization-Header aus Argument oder ``TIINGO_API_KEY`` bilden."""
+    token = token or os.getenv("TIINGO_API_KEY")  # API-Key aus Argument oder Umgebung beziehen
+    if not token:  # ohne gültigen Schlüssel lässt sich die API nicht nutzen
+        raise RuntimeError("TIINGO_API_KEY is not set.")  # klarer Fehler für fehlende Credentials
+    return {"Authorization": f"Token {token}"}  # Token im Header statt in der URL
+
+def _load_tiingo_crypto_batch(
+    assets: List[str],
+    start: str,
+    end: str,
+    token: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    cache_dir: Optional[Path] = TIINGO_CACHE_DIR,
+    as_table: bool = False,
+    cache_ttl: float = CACHE_TTL_SEC,
+) -> dict:
+    """Mehrere Krypto-Ticker mit einer Anfrage laden.
+
+    Der Krypto-Endpunkt akzeptiert eine kommagetrennte ``tickers``-Liste und
+    liefert je Ticker einen Eintrag mit ``priceData``.
+
+    Parameters
+    ----------
+    assets : List[str]
+        Krypto-Ticker in Tiingo-Notation (z. B. ``BTCUSD``).
+    start, end : str
+        Zeitfenster im ISO-Format.
+    token, session, cache_dir, as_table, cache_ttl
+        Wie bei ``_load_tiingo``.
+
+    Returns
+    -------
+    dict
+        Ticker (Großschreibung) → DataFrame/Arrow-Tabelle; Ticker ohne Daten fehlen.
+    """
+    headers = _auth_headers(token)  # Token im Header statt in der URL
+    session = session or SESSION  # geteilte Verbindung wiederverwenden
+    to_tabular = _records_table if as_table else _records_frame  # Zielformat einmal wählen
+    url = "https://api.tiingo.com/tiingo/crypto/prices"  # Basis-URL für Krypto-API
+    tickers = ",".join(a.lower() for a in assets)  # ein Abruf für alle Paare
+    params = {"tickers": tickers, "startDate": start, "endDate": end, "resampleFreq": "1day"}  # Query-Parameter zusammenstellen
+    payload = cached_get_json(session, url, params, headers, cache_dir, cache_ttl)  # Cache oder HTTP-Abruf
+    return {
+        item["ticker"].upper(): to_tabular(item.get("priceData", []))  # Antwort je Ticker aufteilen
+        for item in payload or []
+    }
+
+def _load_tiingo(
+    asset: str,
+    start: str,
+    end: str,
+    token: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    cache_dir: Optional[Path] = TIINGO_CACHE_DIR,
+    as_table: bool = False,
+    cache_ttl: float = CACHE_TTL_SEC,
+) -> pd.DataFrame:  # API-Aufruf pro Asset
     """Rohdaten direkt von Tiingo laden.
 
     Parameters
@@ -40,34 +146,103 @@ def _load_tiingo(asset: str, start: str, end: str, token: Optional[str] = None)
         Zeitfenster im ISO-Format.
     token : str | None
         API-Schlüssel; falls ``None``, wird ``TIINGO_API_KEY`` verwendet.
+    session : requests.Session | None
+        HTTP-Session; ``None`` nutzt die modulweite Keep-Alive-Session.
+    cache_dir : Path | None
+        Verzeichnis für den Antwort-Cache; ``None`` schaltet ihn ab.
+    as_table : bool, optional
+        ``True`` liefert eine ``pyarrow.Table`` (für ``save_parquet`` ohne
+        pandas-Umweg), sonst ein DataFrame.
+    cache_ttl : float, optional
+        Höchstalter wiederverwendeter Antworten in Sekunden (``math.inf`` = unbegrenzt).
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame | pyarrow.Table
         Unveränderte Antwort der Tiingo-API.
     """
-    token = token or os.getenv("TIINGO_API_KEY")  # API-Key aus Argument oder Umgebung beziehen
-    if not token:  # ohne gültigen Schlüssel lässt sich die API nicht nutzen
-        raise RuntimeError("TIINGO_API_KEY is not set.")  # klarer Fehler für fehlende Credentials
-
     if _is_crypto(asset):  # Branch: Krypto-Ticker benötigen eigenen Endpunkt
-        url = "https://api.tiingo.com/tiingo/crypto/prices"  # Basis-URL für Krypto-API
-        params = {"tickers": asset.lower(), "startDate": start, "endDate": end, "resampleFreq": "1day", "token": token}  # Query-Parameter zusammenstellen
-        r = requests.get(url, params=params, timeout=30); r.raise_for_status()  # GET-Anfrage mit Timeout, Fehler bei HTTP!=200
-        payload = r.json()  # Antwort als Python-Struktur dekodieren
-        if not payload:  # leere Liste bedeutet keine Daten verfügbar
+        out = _load_tiingo_crypto_batch([asset], start, end, token, session, cache_dir, as_table, cache_ttl)  # Stapel der Größe 1
+        if not out:  # leere Liste bedeutet keine Daten verfügbar
             raise ValueError(f"No crypto data returned for {asset}.")  # explizite Fehlermeldung
-        rows = payload[0].get("priceData", [])  # Preiszeitreihe aus erster Listeneinheit extrahieren
-        return pd.DataFrame(rows)  # Umwandlung in DataFrame zur Weiterverarbeitung
+        return next(iter(out.values()))  # Preiszeitreihe der ersten Listeneinheit
     else:  # Branch: klassische Aktien-/ETF-Ticker
+        headers = _auth_headers(token)  # Token im Header statt in der URL
+        session = session or SESSION  # geteilte Verbindung wiederverwenden
+        to_tabular = _records_table if as_table else _records_frame  # Zielformat einmal wählen
         url = f"https://api.tiingo.com/tiingo/daily/{asset}/prices"  # API-Endpunkt je Asset
-        params = {"startDate": start, "endDate": end, "resampleFreq": "daily", "token": token}  # Parameter für Tagesdaten
-        r = requests.get(url, params=params, timeout=30); r.raise_for_status()  # Abruf End-of-Day Daten, Fehler bei HTTP!=200
-        return pd.DataFrame(r.json())  # JSON-Liste direkt in DataFrame konvertieren
+        params = {"startDate": start, "endDate": end, "resampleFreq": "daily"}  # Parameter für Tagesdaten
+        payload = cached_get_json(session, url, params, headers, cache_dir, cache_ttl)  # End-of-Day Daten (Cache oder HTTP)
+        return to_tabular(payload)  # JSON-Liste direkt in DataFrame/Arrow-Tabelle konvertieren
+
+def _raw_covers(path: Path, start: str, end: str, crypto: bool, ttl: float = CACHE_TTL_SEC) -> bool:
+    """Prüfen, ob eine vorhandene RAW-Datei das Fenster ``[start, end]`` bereits abdeckt.
+
+    Gelesen werden nur die Min/Max-Statistiken der ``date``-Spalte aus dem
+    Parquet-Footer. Erwartet werden die erste und letzte NYSE-Session im
+    Fenster (Krypto: Kalendertage). Offene Fenster (``end`` ab heute) gelten
+    nie als abgedeckt, ebenso Dateien älter als ``ttl`` Sekunden: ihre
+    adjustierten Spalten können durch spätere Splits/Dividenden veraltet sein.
+    """
+    if not HAVE_PYARROW or not path.exists() or pd.Timestamp(end).date() >= date.today():
+        return False
+    if time.time() - path.stat().st_mtime >= ttl:  # veraltete adj*-Werte → neu laden
+        return False
+    try:
+        md = pq.read_metadata(path)
+        j = md.schema.to_arrow_schema().get_field_index("date")
+        if j < 0 or md.num_row_groups == 0:
+            return False
+        stats = [md.row_group(g).column(j).statistics for g in range(md.num_row_groups)]
+        if any(st is None or not st.has_min_max for st in stats):
+            return False
+        lo = pd.Timestamp(min(st.min for st in stats))  # ISO-Strings bzw. Timestamps sind ordnungstreu
+        hi = pd.Timestamp(max(st.max for st in stats))
+    except Exception:  # unlesbarer Footer → neu laden
+        return False
+    if crypto:  # Krypto handelt täglich
+        first, last = pd.Timestamp(start), pd.Timestamp(end)
+    else:
+        sessions = nyse_trading_days(start, end, tz="UTC")
+        if len(sessions) == 0:
+            return False
+        first, last = sessions[0], sessions[-1]
+    return lo.date() <= first.date() and hi.date() >= last.date()
 
-def download_raw_prices(assets: Iterable[str], start: str, end: str, token: Optional[str] = None) -> List[str]:  # Batch-Download
+def _rate_limited(fn, calls_per_minute: Optional[int]):
+    """``fn`` so umhüllen, dass Aufrufe threadübergreifend gleichmäßig getaktet werden."""
+    if not calls_per_minute:  # kein Limit → Originalfunktion
+        return fn
+    interval = 60.0 / calls_per_minute  # Mindestabstand zwischen zwei Aufrufen
+    lock = threading.Lock()  # schützt den nächsten freien Zeitslot
+    next_slot = [time.monotonic()]  # veränderbarer Zustand für die Closure
+
+    def wrapper(*args, **kwargs):
+        with lock:  # Slot reservieren, gewartet wird außerhalb der Sperre
+            slot = max(next_slot[0], time.monotonic())
+            next_slot[0] = slot + interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return fn(*args, **kwargs)
+    return wrapper
+
+def download_raw_prices(
+    assets: Iterable[str],
+    start: str,
+    end: str,
+    token: Optional[str] = None,
+    n_jobs: int = 8,
+    calls_per_minute: Optional[int] = None,
+    force_refresh: bool = False,
+    cache_ttl: float = CACHE_TTL_SEC,
+) -> List[str]:  # Batch-Download
     """Mehrere Assets herunterladen und als Parquet speichern.
 
+    Downloads laufen in ``n_jobs`` Threads; das Schreiben eines fertigen Assets
+    im Hauptthread überlappt mit den noch laufenden HTTP-Anfragen. Alle
+    Krypto-Ticker teilen sich eine Anfrage an den Krypto-Endpunkt.
+
     Parameters
     ----------
     assets : Iterable[str]
@@ -76,21 +251,59 @@ def download_raw_prices(assets: Iterable[str], start: str, end: str, token: Opti
         Zeitfenster der Abfrage.
     token : str | None
         Optionaler API-Key.
+    n_jobs : int, optional
+        Anzahl paralleler Downloads; die Threads teilen den Verbindungspool
+        der Session (``pool_maxsize`` 32).
+    calls_per_minute : int | None, optional
+        Obergrenze für API-Aufrufe je Minute über alle Threads; ``None`` = ohne.
+    force_refresh : bool, optional
+        ``False`` überspringt Assets, deren RAW-Datei jünger als
+        ``cache_ttl`` ist und das abgeschlossene Fenster laut
+        Footer-Statistik bereits abdeckt; ``True`` lädt immer neu.
+    cache_ttl : float, optional
+        Höchstalter (Sekunden) für RAW-Dateien und zwischengespeicherte
+        Antworten; ``math.inf`` verwendet beide unbegrenzt (Warmlauf offline).
 
     Returns
     -------
     List[str]
-        Pfade zu geschriebenen Parquet-Dateien.
+        Pfade zu geschriebenen Parquet-Dateien (in Eingabereihenfolge).
     """
-    written: List[str] = []  # sammelt Pfade der erfolgreich geschriebenen Dateien
-    for asset in assets:  # iteriere über alle angeforderten Ticker
-        norm_asset = _normalize_asset(asset)  # Ticker auf API-Konvention normieren
-        try:
-            df = _load_tiingo(norm_asset, start, end, token=token)  # Einzel-Asset von Tiingo laden
-        except Exception as e:  # jegliche Fehler (Netzwerk, API) abfangen
-            print(f"[WARN] {asset}: konnte nicht geladen werden ({e}), skip.")  # warnen, aber Pipeline fortsetzen
-            continue  # nächstes Asset verarbeiten
-        path = raw_asset_path(asset)  # Zielpfad im RAW-Verzeichnis ermitteln
-        save_parquet(df, path)  # DataFrame robust als Parquet schreiben
-        written.append(str(path))  # Pfad als String in Ergebnisliste aufnehmen
-    return written  # Liste aller geschriebenen Dateien zurückgeben
+    assets = list(assets)  # Reihenfolge fixieren (Iterable ggf. nur einmal lesbar)
+    norm = [_normalize_asset(a) for a in assets]  # Ticker auf API-Konvention normieren
+    written: dict[int, str] = {}  # Position → Pfad der erfolgreich geschriebenen Datei
+    todo = []  # Positionen, die tatsächlich geladen werden
+    for i, asset in enumerate(assets):
+        path = raw_asset_path(asset)
+        if not force_refresh and _raw_covers(path, start, end, _is_crypto(norm[i]), cache_ttl):
+            written[i] = str(path)  # vorhandene Datei deckt das Fenster ab → kein Abruf
+        else:
+            todo.append(i)
+    crypto = [i for i in todo if _is_crypto(norm[i])]  # Positionen der Krypto-Paare
+    call = _rate_limited(lambda fn, *a, **kw: fn(*a, **kw), calls_per_minute)  # gemeinsames Ratenlimit
+    with ThreadPoolExecutor(max_workers=max(1, n_jobs)) as pool:
+        futures = {
+            pool.submit(call, _load_tiingo, norm[i], start, end, token=token, as_table=True, cache_ttl=cache_ttl): [i]
+            for i in todo if not _is_crypto(norm[i])
+        }
+        if crypto:  # ein Abruf für alle Krypto-Ticker
+            batch = list(dict.fromkeys(norm[i] for i in crypto))  # Duplikate nur einmal anfragen
+            futures[pool.submit(call, _load_tiingo_crypto_batch, batch, start, end, token=token, as_table=True, cache_ttl=cache_ttl)] = crypto
+        for fut in as_completed(futures):  # fertige Downloads sofort verarbeiten
+            idx = futures[fut]  # betroffene Eingabepositionen
+            try:
+                res = fut.result()  # Arrow-Tabelle bzw. Ticker → Tabelle (Krypto-Stapel)
+            except Exception as e:  # jegliche Fehler (Netzwerk, API) abfangen
+                for i in idx:
+                    print(f"[WARN] {assets[i]}: konnte nicht geladen werden ({e}), skip.")  # warnen, aber Pipeline fortsetzen
+                continue  # nächsten Download verarbeiten
+            parts = res if isinstance(res, dict) else {norm[idx[0]]: res}  # einheitlich: Ticker → Tabelle
+            for i in idx:
+                df = parts.get(norm[i])
+                if df is None:  # Ticker fehlt in der Stapelantwort
+                    print(f"[WARN] {assets[i]}: keine Daten geliefert, skip.")
+                    continue
+                path = raw_asset_path(assets[i])  # Zielpfad im RAW-Verzeichnis ermitteln
+                save_parquet(df, path)  # Tabelle robust als Parquet schreiben
+                written[i] = str(path)  # Pfad unter Eingabeposition merken
+    return [written[i] for i in sorted(written)]  # Liste aller geschriebenen Dateien zurückgeben
@@ -29,6 +29,7 @@ from src.data.build_interim import build_interim_prices  # INTERIM-Stufe
 from src.data.build_clean import build_clean_data, write_clean_manifest  # CLEAN + Manifest
 from src.features.riskfree_interest import fetch_fred_nyse_daily  # Zinsserie
 from src.utils.parquet_io import save_parquet  # Parquet-IO
+from src.utils.http_cache import CACHE_TTL_SEC, ttl_seconds  # Cache-Gültigkeit je Quelle
 
 def main():
     """Pipeline sequentiell ausführen und Zwischenschritte speichern."""
@@ -37,7 +38,14 @@ def main():
     start, end = get_window()               # Zeitfenster bestimmen
 
     print(f"[1/5] RAW → {RAW_DIR} | Assets={assets_flat} | {start}..{end}")  # Statusausgabe
-    download_raw_prices(assets_flat, start, end)  # Rohdaten abrufen
+    dl_cfg = SPEC.get("download", {}) or {}  # Parallelität/Ratenlimit aus der Spezifikation
+    ttl_cfg = (SPEC.get("cache", {}) or {}).get("ttl_sec", {}) or {}  # Cache-Gültigkeit je Quelle (null = unbegrenzt)
+    download_raw_prices(
+        assets_flat, start, end,
+        n_jobs=int(dl_cfg.get("n_jobs", 8)),
+        calls_per_minute=dl_cfg.get("calls_per_minute"),
+        cache_ttl=ttl_seconds(ttl_cfg.get("tiingo", CACHE_TTL_SEC)),
+    )  # Rohdaten abrufen
 
     print(f"[2/5] INTERIM → {INTERIM_PANEL}")
     cryptos = set(groups.get("crypto", []))  # separate Krypto-Liste für 24/7
@@ -45,13 +53,14 @@ def main():
         assets=assets_flat, start=start, end=end, spec=SPEC, crypto_assets=cryptos, save=True
     )  # Preise auf Sessions ausrichten und speichern
 
-    sessions = panel_interim.index.get_level_values("date").unique().sort_values()  # benötigte Handelstage
+    sessions = panel_interim.index.levels[0]  # Gitter Datum × Asset: Datumsachse = Handelstage (eindeutig, sortiert)
 
     print(f"[3/5] Risk-free (FRED) → {RISKFREE_FILE}")
     rf_cfg = SPEC.get("risk_free", {}) or {}  # Fallback auf leeres Dict
     fred_series = rf_cfg.get("series_id", "DGS3MO")  # Standard 3-Monats-TBill
     fred_fill   = rf_cfg.get("fill", "ffill")  # Füllmethode
-    rf_annual_pct = fetch_fred_nyse_daily(series_id=fred_series, start=start, end=end, fill=fred_fill)
+    rf_annual_pct = fetch_fred_nyse_daily(series_id=fred_series, start=start, end=end, fill=fred_fill, sessions=sessions,
+                                          cache_ttl=ttl_seconds(ttl_cfg.get("fred", CACHE_TTL_SEC)))
     rf_annual = (rf_annual_pct.astype(float) / 100.0).reindex(sessions).ffill().rename("risk_free_annual")
     save_parquet(rf_annual.to_frame(), RISKFREE_FILE)  # als Parquet sichern
 
@@ -0,0 +1,370 @@
+# ---------------------------------------------------------------------------
+# Datei: src/features/_numba_loops.py
+# Zweck: JIT-kompilierte Schleifen für die Spread-/Volaschätzer nach
+#   Corwin/Schultz und Becker/Parkinson sowie für den festen TA-Feature-Satz
+#   der CLEAN-Stufe.
+# Hauptfunktionen: ``_cs_beta``, ``_cs_gamma``, ``_cs_alpha``,
+#   ``_cs_spread_from_alpha``, ``_bp_sigma``, ``_adv_block`` und ``_ta_block``.
+# Ein-/Ausgabe: zusammenhängende float64-Matrizen ``(Zeit × Asset)``.
+# Abhängigkeiten: ``numpy`` und optional ``numba``; ohne numba greift ein
+#   No-op-Shim, die Aufrufer nutzen dann ihren pandas-Pfad.
+# ---------------------------------------------------------------------------
+"""
+Numba-Kernel für die Corwin–Schultz- und Becker–Parkinson-Schätzer sowie die
+technischen Indikatoren der CLEAN-Stufe.
+Alle Kernel laufen spaltenweise (je Asset) über die Zeitachse und bilden die
+NaN-Semantik der pandas-Variante nach (``rolling`` mit vollem Fenster,
+``ewm(adjust=False)`` inklusive Gewichtsverfall über Lücken).
+``HAVE_NUMBA`` zeigt an, ob echte Kompilierung verfügbar ist.
+"""
+
+import math  # skalare Mathematik innerhalb der Kernel
+import numpy as np  # Array-Allokation
+
+# Versuch, numba zu laden; sonst neutraler Dekorator
+try:
+    from numba import njit  # JIT-Compiler für numerische Schleifen
+    HAVE_NUMBA = True  # Kennzeichen: Kernel werden kompiliert
+except ImportError:  # numba ist optional
+    HAVE_NUMBA = False  # Aufrufer verwenden den pandas-Pfad
+
+    def njit(*args, **kwargs):  # noqa: D401 - Shim mit gleicher Signatur
+        """No-op-Ersatz für ``numba.njit`` (mit und ohne Argumente nutzbar)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]  # @njit ohne Klammern
+        return lambda f: f  # @njit(...) mit Optionen
+
+NO_OUT = np.empty((0, 0))  # Platzhalter für nicht benötigte Kernel-Ausgaben
+
+# Konstanten der CS-Herleitung (einmalig berechnet)
+_DEN = 3.0 - 2.0 * math.sqrt(2.0)  # gemeinsamer Nenner
+_K2 = math.sqrt(8.0 / math.pi)  # Konstante aus der Parkinson-Herleitung
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _cs_beta(high, low, k):
+    """Beta-Term: Summe zweier quadrierter Log-Spannen, optional k-Mittel."""
+    n, m = high.shape
+    out = np.full((n, m), np.nan)  # NaN bis das Fenster voll ist
+    for j in range(m):
+        prev = np.nan  # quadrierte Spanne des Vortags
+        for i in range(n):
+            hl = math.log(high[i, j] / low[i, j]) ** 2  # NaN bleibt NaN
+            if i >= 1:  # rolling(2).sum(); inf im Fenster ergibt dort NaN
+                out[i, j] = hl + prev if not (math.isinf(hl) or math.isinf(prev)) else np.nan
+            prev = hl
+        if k > 1:  # optionales Glätten: rolling(k).mean() mit vollem Fenster
+            col = out[:, j].copy()
+            for i in range(n):
+                if i < k - 1:
+                    out[i, j] = np.nan
+                    continue
+                acc = 0.0
+                for w in range(i - k + 1, i + 1):
+                    acc += col[w]  # NaN im Fenster → NaN
+                out[i, j] = acc / k
+    return out
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _cs_gamma(high, low):
+    """Gamma-Term: quadrierte Log-Spanne über zwei Tage."""
+    n, m = high.shape
+    out = np.full((n, m), np.nan)
+    for j in range(m):
+        for i in range(1, n):
+            h0, h1 = high[i - 1, j], high[i, j]
+            l0, l1 = low[i - 1, j], low[i, j]
+            if math.isnan(h0) or math.isnan(h1) or math.isnan(l0) or math.isnan(l1):
+                continue  # rolling(2).max/min verlangt zwei gültige Werte
+            out[i, j] = math.log(max(h0, h1) / min(l0, l1)) ** 2
+    return out
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _cs_alpha(beta, gamma):
+    """Alpha-Term, negative Werte auf 0 gekappt."""
+    n, m = beta.shape
+    out = np.empty((n, m))
+    coef = (math.sqrt(2.0) - 1.0) / _DEN
+    for j in range(m):
+        for i in range(n):
+            a = coef * math.sqrt(beta[i, j]) - math.sqrt(gamma[i, j] / _DEN)
+            out[i, j] = a if not a < 0.0 else 0.0  # clip(lower=0), NaN bleibt
+    return out
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _cs_spread_from_alpha(alpha):
+    """Relativer Spread ``2(e^a - 1)/(1 + e^a) = 2 tanh(a/2)``."""
+    n, m = alpha.shape
+    out = np.empty((n, m))
+    for j in range(m):
+        for i in range(n):
+            out[i, j] = 2.0 * math.tanh(0.5 * alpha[i, j])  # eine Transzendente statt exp + Division
+    return out
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _bp_sigma(beta, gamma):
+    """Becker/Parkinson-Volatilität, negative Werte auf 0 gekappt."""
+    n, m = beta.shape
+    out = np.empty((n, m))
+    c1 = (2.0 ** -0.5 - 1.0) / (_K2 * _DEN)
+    c2 = _K2 ** 2 * _DEN
+    for j in range(m):
+        for i in range(n):
+            s = c1 * math.sqrt(beta[i, j]) + math.sqrt(gamma[i, j] / c2)
+            out[i, j] = s if not s < 0.0 else 0.0
+    return out
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _cs_block(high, low, k, sigma_out, spread_out, beta_out, gamma_out, alpha_out):
+    """Becker/Parkinson-Sigma und Corwin–Schultz-Spread in einem Durchlauf.
+
+    Fasst ``_cs_beta``, ``_cs_gamma``, ``_cs_alpha``, ``_cs_spread_from_alpha``
+    und ``_bp_sigma`` zusammen (gleiche Rechenreihenfolge, bitgleiche
+    Ergebnisse), ohne die vier Zwischenmatrizen anzulegen; ``sqrt(beta)``
+    wird je Punkt nur einmal gezogen. Geschrieben wird direkt in die (ggf.
+    float32-) Ausgabesichten ``(Zeit, Asset)``. Beta, Gamma und Alpha landen
+    nur in Ausgaben mit Inhalt; ``NO_OUT`` (leer) überspringt sie.
+    """
+    n, m = high.shape
+    coef = (math.sqrt(2.0) - 1.0) / _DEN
+    c1 = (2.0 ** -0.5 - 1.0) / (_K2 * _DEN)
+    c2 = _K2 ** 2 * _DEN
+    raw = np.empty(n)  # ungeglättetes Beta je Zeitpunkt (nur für k > 1 gebraucht)
+    terms = beta_out.size > 0  # Zwischenterme gewünscht (einmal je Aufruf entschieden)
+    for j in range(m):
+        prev = np.nan  # quadrierte Spanne des Vortags
+        for i in range(n):
+            hl = math.log(high[i, j] / low[i, j]) ** 2
+            raw[i] = hl + prev if i >= 1 and not (math.isinf(hl) or math.isinf(prev)) else np.nan  # rolling(2).sum()
+            prev = hl
+            if k > 1:  # rolling(k).mean() über Beta mit vollem Fenster
+                if i < k - 1:
+                    beta = np.nan
+                else:
+                    acc = 0.0
+                    for w in range(i - k + 1, i + 1):
+                        acc += raw[w]
+                    beta = acc / k
+            else:
+                beta = raw[i]
+            gamma = np.nan
+            if i >= 1:
+                h0, h1 = high[i - 1, j], high[i, j]
+                l0, l1 = low[i - 1, j], low[i, j]
+                if not (math.isnan(h0) or math.isnan(h1) or math.isnan(l0) or math.isnan(l1)):
+                    gamma = math.log(max(h0, h1) / min(l0, l1)) ** 2
+            sb = math.sqrt(beta)  # gemeinsamer Teilausdruck von Alpha und Sigma
+            a = coef * sb - math.sqrt(gamma / _DEN)
+            a = a if not a < 0.0 else 0.0  # clip(lower=0), NaN bleibt
+            spread_out[i, j] = 2.0 * math.tanh(0.5 * a)  # = 2(e^a - 1)/(1 + e^a)
+            sg = c1 * sb + math.sqrt(gamma / c2)
+            sigma_out[i, j] = sg if not sg < 0.0 else 0.0
+            if terms:
+                beta_out[i, j] = beta
+                gamma_out[i, j] = gamma
+                alpha_out[i, j] = a
+
+
+# ------------------------- TA-Kernel (CLEAN-Feature-Satz) -------------------------
+# Fenster sind fest (SMA 20/60, EMA 12/26, RSI/ADX 14, MACD-Signal 9,
+# Bollinger 20/2.0, CCI 20) und entsprechen ``FEATURE_COLUMNS`` in build_clean.
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _ewm_mean(x, com, minp, out):
+    """``ewm(com=com, adjust=False, min_periods=minp).mean()`` einer Spalte."""
+    n = x.shape[0]
+    if n == 0:
+        return
+    alpha = 1.0 / (1.0 + com)  # wie pandas: alpha aus Schwerpunkt
+    old_wt_factor = 1.0 - alpha
+    minp = max(minp, 1)
+    weighted = x[0]
+    nobs = 0 if math.isnan(weighted) else 1  # kumulierte Beobachtungen
+    out[0] = weighted if nobs >= minp else np.nan
+    old_wt = 1.0
+    for i in range(1, n):
+        cur = x[i]
+        is_obs = not math.isnan(cur)
+        if is_obs:
+            nobs += 1
+        if not math.isnan(weighted):
+            old_wt *= old_wt_factor  # Gewicht verfällt auch über NaN-Lücken
+            if is_obs:
+                if weighted != cur:  # konstante Reihe: keine Rundungsfehler
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur  # erste Beobachtung startet die Glättung
+        out[i] = weighted if nobs >= minp else np.nan
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _rolling_mean(x, w, out):
+    """``rolling(w, min_periods=w).mean()``: NaN, sobald das Fenster Lücken hat."""
+    n = x.shape[0]
+    for i in range(n):
+        if i < w - 1:
+            out[i] = np.nan
+            continue
+        acc = 0.0
+        for k in range(i - w + 1, i + 1):
+            acc += x[k]  # NaN im Fenster → NaN
+        out[i] = acc / w
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _adv_block(close, volume, w, out):
+    """Durchschnittlichen Dollar-Umsatz ``rolling(w).mean()`` von Close×Volume je Spalte in ``out`` schreiben."""
+    n, m = close.shape
+    dv = np.empty(n)  # Dollar-Umsatz der aktuellen Spalte
+    adv = np.empty(n)
+    for j in range(m):
+        for i in range(n):
+            dv[i] = close[i, j] * volume[i, j]
+        _rolling_mean(dv, w, adv)
+        for i in range(n):
+            out[i, j] = adv[i]  # Cast in den Zieltyp beim Schreiben
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _nan_if_zero(v):
+    """``replace(0, np.nan)`` für Skalare."""
+    return np.nan if v == 0.0 else v
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _fmax(a, b):
+    """``np.fmax`` für Skalare: NaN nur, wenn beide Werte NaN sind."""
+    if math.isnan(a):
+        return b
+    if math.isnan(b):
+        return a
+    return a if a >= b else b
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _ta_block(high, low, close, out):
+    """Feste TA-Features aller Asset-Spalten in ``out`` (Zeit × Asset × 16) schreiben.
+
+    Slot-Reihenfolge: SMA20, SMA60, EMA12, EMA26, RSI14, MACD-Linie/-Signal/
+    -Histogramm, Bollinger Mitte/oben/unten/Breite, CCI20, ADX14, +DI14, -DI14.
+    """
+    n, m = close.shape
+    # Arbeitspuffer je Spalte (einmal allokiert, für alle Assets wiederverwendet)
+    c = np.empty(n)
+    sma20 = np.empty(n)
+    sma60 = np.empty(n)
+    ema12 = np.empty(n)
+    ema26 = np.empty(n)
+    up = np.empty(n)
+    down = np.empty(n)
+    roll_up = np.empty(n)
+    roll_down = np.empty(n)
+    line = np.empty(n)
+    signal = np.empty(n)
+    tp = np.empty(n)
+    sma_tp = np.empty(n)
+    tr = np.empty(n)
+    pdm = np.empty(n)
+    mdm = np.empty(n)
+    tr_sm = np.empty(n)
+    pdm_sm = np.empty(n)
+    mdm_sm = np.empty(n)
+    dx = np.empty(n)
+    adx = np.empty(n)
+    wilder = (1.0 - 1.0 / 14) / (1.0 / 14)  # Schwerpunkt zu alpha = 1/14
+    for j in range(m):
+        for i in range(n):
+            c[i] = close[i, j]  # zusammenhängende Kopie der Spalte
+
+        # Gleitende Durchschnitte und EMAs
+        _rolling_mean(c, 20, sma20)
+        _rolling_mean(c, 60, sma60)
+        _ewm_mean(c, (12 - 1) / 2, 12, ema12)
+        _ewm_mean(c, (26 - 1) / 2, 26, ema26)
+
+        # RSI: Auf-/Abwärtsbewegungen (NaN bleibt NaN) mit Wilder-Glättung
+        up[0] = np.nan
+        down[0] = np.nan
+        for i in range(1, n):
+            d = c[i] - c[i - 1]
+            up[i] = d if not d < 0.0 else 0.0  # clip(lower=0)
+            down[i] = -d if not d > 0.0 else 0.0  # -clip(upper=0)
+        _ewm_mean(up, wilder, 14, roll_up)
+        _ewm_mean(down, wilder, 14, roll_down)
+
+        # MACD aus den EMAs
+        for i in range(n):
+            line[i] = ema12[i] - ema26[i]
+        _ewm_mean(line, (9 - 1) / 2, 9, signal)
+
+        # Typical Price für CCI, True Range und Directional Movement für ADX
+        for i in range(n):
+            h, lo = high[i, j], low[i, j]
+            tp[i] = (h + lo + c[i]) / 3.0
+            if i == 0:
+                tr[i] = h - lo  # fmax ignoriert fehlenden Vortagesschluss
+                pdm[i] = 0.0
+                mdm[i] = 0.0
+                continue
+            pc = c[i - 1]
+            tr[i] = _fmax(_fmax(h - lo, abs(h - pc)), abs(lo - pc))
+            up_move = h - high[i - 1, j]
+            down_move = -(lo - low[i - 1, j])
+            pdm[i] = up_move if (up_move > down_move and up_move > 0.0) else 0.0
+            mdm[i] = down_move if (down_move > up_move and down_move > 0.0) else 0.0
+        _rolling_mean(tp, 20, sma_tp)
+        _ewm_mean(tr, wilder, 14, tr_sm)
+        _ewm_mean(pdm, wilder, 14, pdm_sm)
+        _ewm_mean(mdm, wilder, 14, mdm_sm)
+        for i in range(n):
+            tr_den = _nan_if_zero(tr_sm[i])
+            p = 100.0 * (pdm_sm[i] / tr_den)
+            q = 100.0 * (mdm_sm[i] / tr_den)
+            out[i, j, 14] = p
+            out[i, j, 15] = q
+            dx[i] = 100.0 * abs(p - q) / _nan_if_zero(p + q)
+        _ewm_mean(dx, wilder, 14, adx)
+
+        for i in range(n):
+            # Bollinger (Stichproben-Std) und CCI (mittlere absolute Abweichung)
+            std = np.nan
+            mad = np.nan
+            if i >= 19 and not math.isnan(sma20[i]):
+                mu = sma20[i]
+                ss = 0.0
+                for k in range(i - 19, i + 1):
+                    ss += (c[k] - mu) ** 2
+                std = math.sqrt(ss / 19.0)
+            if i >= 19 and not math.isnan(sma_tp[i]):
+                acc = 0.0
+                for k in range(i - 19, i + 1):
+                    acc += tp[k]
+                mu = acc / 20.0  # Fenster-Mittel wie ``x.mean()``
+                acc = 0.0
+                for k in range(i - 19, i + 1):
+                    acc += abs(tp[k] - mu)
+                mad = acc / 20.0
+            rs = roll_up[i] / _nan_if_zero(roll_down[i])
+            upper = sma20[i] + 2.0 * std
+            lower = sma20[i] - 2.0 * std
+
+            out[i, j, 0] = sma20[i]
+            out[i, j, 1] = sma60[i]
+            out[i, j, 2] = ema12[i]
+            out[i, j, 3] = ema26[i]
+            out[i, j, 4] = 100.0 - (100.0 / (1.0 + rs))
+            out[i, j, 5] = line[i]
+            out[i, j, 6] = signal[i]
+            out[i, j, 7] = line[i] - signal[i]
+            out[i, j, 8] = sma20[i]
+            out[i, j, 9] = upper
+            out[i, j, 10] = lower
+            out[i, j, 11] = (upper - lower) / _nan_if_zero(sma20[i])
+            out[i, j, 12] = (tp[i] - sma_tp[i]) / (0.015 * _nan_if_zero(mad))
+            out[i, j, 13] = adx[i]
@@ -11,14 +11,51 @@
 """Basisindikatoren auf Preis- und Volumendaten.
 Enthält Renditeberechnungen sowie Schätzer für Spread und Volatilität nach
 Corwin/Schultz und Becker/Parkinson. Einsatz im frühen State der
-Feature-Pipeline."""
+Feature-Pipeline. Die Funktionen arbeiten spaltenweise und akzeptieren neben
+Serien auch breite DataFrames (Datum × Asset)."""
 
 from __future__ import annotations  # zukunftsfähige Typannotationen (Python 3.7+)
 import pandas as pd  # DataFrame/Series als zentrale Datenstrukturen
 import numpy as np  # effiziente numerische Routinen
 
+# JIT-Kernel (nur genutzt, wenn numba installiert ist)
+from src.features import _numba_loops as _nl
+
 # Hinweis: High/Low/Open/Close sowie Volumen stammen direkt aus dem Preis-Feed.
 
+# Konstanten der CS-/Parkinson-Herleitung (einmalig je Modul statt je Aufruf)
+_DEN = 3.0 - 2.0 * np.sqrt(2.0)  # gemeinsamer Nenner
+_K2 = np.sqrt(8.0 / np.pi)  # Konstante aus der Parkinson-Herleitung
+_ALPHA_COEF = (np.sqrt(2.0) - 1.0) / _DEN  # Vorfaktor von sqrt(beta) im Alpha-Term
+_BP_DEN_BETA = _K2 * _DEN  # Nenner des Beta-Summanden (Becker/Parkinson)
+_BP_DEN_GAMMA = _K2 ** 2 * _DEN  # Nenner des Gamma-Summanden (Becker/Parkinson)
+
+
+def _as_matrix(x) -> np.ndarray:
+    """Series/DataFrame als zusammenhängende float64-Matrix ``(Zeit × Spalten)``."""
+    return np.ascontiguousarray(x.to_numpy(dtype=np.float64)).reshape(len(x), -1)
+
+
+def _like(values: np.ndarray, like):
+    """Kernel-Ergebnis in die Form der Eingabe (Series oder DataFrame) zurückführen."""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=like.index, columns=like.columns)
+    return pd.Series(values[:, 0], index=like.index)
+
+
+def _same_labels(a, b) -> bool:
+    """Prüfen, ob zwei Eingaben denselben Index (und dieselben Spalten) tragen.
+
+    Die Kernel rechnen positionsweise; bei abweichenden Labels greift der
+    pandas-Pfad, der wie bisher über die Labels ausrichtet.
+    """
+    if isinstance(a, pd.DataFrame) != isinstance(b, pd.DataFrame):
+        return False  # Series gegen DataFrame: pandas-Broadcast
+    same = a.index.equals(b.index)  # Regelfall: identische Zeitachse
+    if isinstance(a, pd.DataFrame):
+        same = same and a.columns.equals(b.columns)  # auch die Spaltenreihenfolge muss passen
+    return same
+
 
 # ------------------------- logarithmische Returns und lineare Returns -------------------------
 
@@ -38,7 +75,14 @@ def returns(close: pd.Series, kind: str = "log") -> pd.Series:
         Renditeserie mit ``NaN`` an der ersten Stelle.
     """
     if kind == "log":  # Zweig für logarithmische Rendite
-        return np.log(close / close.shift(1))  # ln(P_t / P_{t-1})
+        with np.errstate(divide="ignore", invalid="ignore"):  # Nullkurse → ±inf/NaN wie ``np.log(a / b)``
+            logc = np.log(close.to_numpy(dtype=np.float64))  # ein Log-Durchlauf statt shift → Quotient → Log
+            out = np.empty_like(logc)
+            out[:1] = np.nan  # erste Zeile ohne Vortag
+            np.subtract(logc[1:], logc[:-1], out=out[1:])  # ln P_t - ln P_{t-1}
+        if isinstance(close, pd.DataFrame):
+            return pd.DataFrame(out, index=close.index, columns=close.columns)
+        return pd.Series(out, index=close.index, name=close.name)
     return close.pct_change()  # lineare prozentuale Veränderung
 
 # ------------------------- Spread und Vola Schätzung -------------------------
@@ -58,7 +102,10 @@ def corwin_schultz_beta(high: pd.Series, low: pd.Series, sample_length: int = 1)
     pd.Series
         Gleitend berechnetes ``beta``.
     """
-    hl = np.log(high / low) ** 2  # quadrierte Intraday-Range
+    if _nl.HAVE_NUMBA and _same_labels(high, low):  # kompilierter Einzeldurchlauf statt mehrerer pandas-Passes
+        return _like(_nl._cs_beta(_as_matrix(high), _as_matrix(low), int(sample_length or 1)), high)
+    hl = np.log(high / low)  # logarithmische Intraday-Range
+    hl = hl * hl  # quadriert (Multiplikation statt Potenz)
     beta = hl.rolling(2).sum()  # Summation der letzten zwei Tage
     if sample_length and sample_length > 1:  # optionales Glätten über mehrere Tage
         beta = beta.rolling(sample_length).mean()  # Mittelwert über Fenster
@@ -77,9 +124,12 @@ def corwin_schultz_gamma(high: pd.Series, low: pd.Series) -> pd.Series:
     pd.Series
         ``gamma``-Werte als Basis für Spread/Volatilität.
     """
+    if _nl.HAVE_NUMBA and _same_labels(high, low):
+        return _like(_nl._cs_gamma(_as_matrix(high), _as_matrix(low)), high)
     h_max = high.rolling(2).max()  # Maximum der letzten zwei Hochs
     l_min = low.rolling(2).min()  # Minimum der letzten zwei Tiefs
-    return np.log(h_max / l_min) ** 2  # logarithmische Spannweite im Quadrat
+    g = np.log(h_max / l_min)  # logarithmische Spannweite
+    return g * g  # im Quadrat
 
 def corwin_schultz_alpha(beta: pd.Series, gamma: pd.Series) -> pd.Series:
     """Alpha-Term: Kombination aus Beta und Gamma.
@@ -94,9 +144,10 @@ def corwin_schultz_alpha(beta: pd.Series, gamma: pd.Series) -> pd.Series:
     pd.Series
         ``alpha``-Serie, negative Werte werden auf 0 gesetzt.
     """
-    den = 3.0 - 2.0 * np.sqrt(2.0)  # Nenner der CS-Formel
-    alpha = ((np.sqrt(2.0) - 1.0) / den) * np.sqrt(beta)  # erster Summand
-    alpha = alpha - np.sqrt(gamma / den)  # zweiter Summand
+    if _nl.HAVE_NUMBA and _same_labels(beta, gamma):
+        return _like(_nl._cs_alpha(_as_matrix(beta), _as_matrix(gamma)), beta)
+    alpha = _ALPHA_COEF * np.sqrt(beta)  # erster Summand
+    alpha = alpha - np.sqrt(gamma / _DEN)  # zweiter Summand
     return alpha.clip(lower=0.0)  # Spread ist nicht negativ definierbar
 
 def corwin_schultz_spread(alpha: pd.Series) -> pd.Series:
@@ -112,8 +163,9 @@ def corwin_schultz_spread(alpha: pd.Series) -> pd.Series:
     pd.Series
         Geschätzter relativer Spread.
     """
-    ex_alpha = np.exp(alpha)  # e^{alpha}
-    return 2.0 * (ex_alpha - 1.0) / (1.0 + ex_alpha)  # Formel aus CS-Paper
+    if _nl.HAVE_NUMBA:
+        return _like(_nl._cs_spread_from_alpha(_as_matrix(alpha)), alpha)
+    return 2.0 * np.tanh(0.5 * alpha)  # = 2(e^a - 1)/(1 + e^a) aus dem CS-Paper, ohne Auslöschung bei kleinem a
 
 def becker_parkinson_sigma(beta: pd.Series, gamma: pd.Series) -> pd.Series:
     """Volatilitätsabschätzung nach Becker/Parkinson.
@@ -128,10 +180,42 @@ def becker_parkinson_sigma(beta: pd.Series, gamma: pd.Series) -> pd.Series:
     pd.Series
         Nicht-negative Volatilitätsabschätzung ``sigma``.
     """
-    k2 = np.sqrt(8.0 / np.pi)  # Konstante aus der Herleitung
-    den = 3.0 - 2.0 * np.sqrt(2.0)  # gemeinsamer Nenner
-    sigma = (2.0 ** -0.5 - 1.0) * (np.sqrt(beta) / (k2 * den))  # erster Summand
-    sigma = sigma + np.sqrt(gamma / (k2 ** 2 * den))  # zweiter Summand
+    if _nl.HAVE_NUMBA and _same_labels(beta, gamma):
+        return _like(_nl._bp_sigma(_as_matrix(beta), _as_matrix(gamma)), beta)
+    sigma = (2.0 ** -0.5 - 1.0) * (np.sqrt(beta) / _BP_DEN_BETA)  # erster Summand
+    sigma = sigma + np.sqrt(gamma / _BP_DEN_GAMMA)  # zweiter Summand
     return sigma.clip(lower=0.0)  # Volatilität darf nicht negativ sein
 
+def corwin_schultz_bundle(high: pd.Series, low: pd.Series, sample_length: int = 1) -> dict:
+    """Alle Spread-/Volaschätzer aus einem High/Low-Paar in einem Aufruf.
 
+    Mit numba läuft alles in einem Durchlauf des fusionierten Kernels
+    ``_cs_block``; im pandas-Pfad werden Beta und Gamma einmal gebildet und
+    Alpha und Sigma teilen sich ``sqrt(beta)``. Beide Pfade liefern dieselben
+    Werte wie die jeweiligen Einzelfunktionen.
+
+    Parameters
+    ----------
+    high, low : pd.Series
+        Tageshochs und -tiefs (auch breit als DataFrame).
+    sample_length : int, optional
+        Glättungsfenster für Beta.
+
+    Returns
+    -------
+    dict
+        ``beta``, ``gamma``, ``alpha``, ``spread`` und ``sigma`` im Format der Eingabe.
+    """
+    if _nl.HAVE_NUMBA and _same_labels(high, low):
+        hi, lo = _as_matrix(high), _as_matrix(low)
+        keys = ("sigma", "spread", "beta", "gamma", "alpha")  # Reihenfolge der Kernel-Ausgaben
+        outs = [np.empty(hi.shape) for _ in keys]
+        _nl._cs_block(hi, lo, int(sample_length or 1), *outs)  # ein Durchlauf, sqrt(beta) einmal je Punkt
+        return {key: _like(arr, high) for key, arr in zip(keys, outs)}
+    beta = corwin_schultz_beta(high, low, sample_length=sample_length)
+    gamma = corwin_schultz_gamma(high, low)
+    sqrt_beta = np.sqrt(beta)  # gemeinsamer Teilausdruck von Alpha und Sigma
+    alpha = (_ALPHA_COEF * sqrt_beta - np.sqrt(gamma / _DEN)).clip(lower=0.0)
+    sigma = ((2.0 ** -0.5 - 1.0) * (sqrt_beta / _BP_DEN_BETA) + np.sqrt(gamma / _BP_DEN_GAMMA)).clip(lower=0.0)
+    return {"beta": beta, "gamma": gamma, "alpha": alpha,
+            "spread": corwin_schultz_spread(alpha), "sigma": sigma}
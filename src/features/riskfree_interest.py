@@ -1,9 +1,12 @@
 # ---------------------------------------------------------------------------
 # Datei: src/features/riskfree_interest.py
 # Zweck: Abruf und Aufbereitung risikofreier Tageszinsen über FRED.
-# Hauptfunktionen: ``fetch_fred_nyse_daily`` sowie Umrechnungen in Tagesraten.
+# Hauptfunktionen: ``fetch_fred_nyse_daily`` (eine Serie),
+#   ``fetch_fred_nyse_daily_batch`` (mehrere Serien parallel) sowie
+#   Umrechnungen in Tagesraten.
 # Ein-/Ausgabe: FRED-Serien-ID → ``pd.Series`` ausgerichtet auf NYSE-Kalender.
-# Abhängigkeiten: ``requests``, ``pandas``, interne Kalender/Align-Helfer.
+# Abhängigkeiten: ``requests``, ``pandas``, interne Kalender/Align-Helfer sowie
+#   Session und Antwort-Cache aus ``src.utils.http_cache``.
 # Edge Cases: fehlender API-Key, leere Antwort, Zeitzonenabgleich.
 # ---------------------------------------------------------------------------
 
@@ -12,14 +15,20 @@ Lieferant: Federal Reserve Bank (z. B. Treasury-Renditen). Die Daten werden au
 NYSE-Handelstage ausgerichtet und optional aufgefüllt."""
 
 import os  # Zugriff auf Umgebungsvariablen für API-Key
-from typing import Optional  # optionale Parameterannotationen
+from concurrent.futures import ThreadPoolExecutor  # parallele Abrufe mehrerer Serien
+from pathlib import Path  # Cache-Verzeichnis
+from typing import List, Optional  # optionale Parameterannotationen
 import requests  # HTTP-Anfragen an FRED-Server
 import pandas as pd  # Datenhaltung und Transformation
 
 from src.data.calendar import nyse_trading_days  # Handelskalender mit Feiertagen
 from src.data.align import align_to_trading_days  # Reindex-Helfer für Series
+from src.utils.http_cache import SESSION, CACHE_TTL_SEC, cached_get_json  # Keep-Alive-Session und Antwort-Cache
+from src.utils.paths import CACHE_DIR  # Wurzel der lokalen Caches
 
 FRED_URL = "https://api.stlouisfed.org/fred/series/observations"  # Basis-Endpoint der API
+# Antwort-Cache (gzip-JSON je Serie und Fenster); per ``FRED_CACHE_DIR`` umlenkbar
+FRED_CACHE_DIR = Path(os.environ.get("FRED_CACHE_DIR") or CACHE_DIR / "fred")
 
 def _resolve_fred_api_key(passed: Optional[str] = None) -> str:
     """FRED API-Key ermitteln.
@@ -45,6 +54,47 @@ def _resolve_fred_api_key(passed: Optional[str] = None) -> str:
     return key  # zurückgeben des Strings
 
 
+def _fetch_fred_observations(
+    series_id: str,
+    start: str,
+    end: str,
+    api_key: str,
+    session: Optional[requests.Session] = None,
+    cache_dir: Optional[Path] = FRED_CACHE_DIR,
+    cache_ttl: float = CACHE_TTL_SEC,
+) -> pd.Series:
+    """Rohbeobachtungen einer FRED-Serie als sortierte Series (Prozent p.a.).
+
+    Der Index liegt in UTC auf Beobachtungsdaten; fehlende Werte (``"."``)
+    werden zu ``NaN``. Ohne Beobachtungen wird eine leere Series geliefert.
+    Antworten laufen über denselben Plattencache wie die Tiingo-Abrufe
+    (Einträge gelten ``cache_ttl`` Sekunden lang, auch für historische Fenster).
+    """
+    params = {  # Parameter für HTTP-GET
+        "series_id": series_id,
+        "observation_start": start,
+        "observation_end": end,
+        "file_type": "json",
+        "api_key": api_key,
+    }
+    data = cached_get_json(session or SESSION, FRED_URL, params, {}, cache_dir, cache_ttl)  # Cache oder HTTP-Abruf
+    obs = pd.DataFrame(data.get("observations", []))  # Observations in DataFrame
+    if obs.empty:  # keine Daten zurückbekommen
+        return pd.Series(name=series_id, dtype="float64")  # leere Serie
+
+    # --- in Series (Prozent p.a.) ---
+    obs["value"] = pd.to_numeric(obs["value"].replace(".", pd.NA), errors="coerce")  # Prozentwerte in float umwandeln
+    obs["date"]  = pd.to_datetime(obs["date"], utc=True)  # Datum direkt in UTC (wie der Kalender)
+    return pd.Series(obs["value"].values, index=pd.DatetimeIndex(obs["date"]), name=series_id).sort_index()  # sortierte Series
+
+def _fill(obj, fill: Optional[str]):
+    """Lücken einer Series/eines DataFrames gemäß ``fill`` (``ffill``/``bfill``/``None``) schließen."""
+    if fill == "ffill":  # vorne auffüllen
+        return obj.ffill()
+    if fill == "bfill":  # hinten auffüllen
+        return obj.bfill()
+    return obj
+
 def fetch_fred_nyse_daily(
     series_id: str = "DGS3MO",
     start: str = "1990-01-01",
@@ -52,6 +102,10 @@ def fetch_fred_nyse_daily(
     api_key: Optional[str] = None,
     fill: str = "ffill",   # "ffill", "bfill" oder None
     tz: str = "UTC",
+    sessions: Optional[pd.DatetimeIndex] = None,
+    session: Optional[requests.Session] = None,
+    cache_dir: Optional[Path] = FRED_CACHE_DIR,
+    cache_ttl: float = CACHE_TTL_SEC,
 ) -> pd.Series:
     """Zeitreihe von FRED holen und auf NYSE-Sessions reindizieren.
 
@@ -67,6 +121,15 @@ def fetch_fred_nyse_daily(
         Auffüllmethode (``ffill``/``bfill``/``None``).
     tz : str, optional
         Zeitzone des Zielindex (Standard UTC).
+    sessions : pd.DatetimeIndex, optional
+        Bereits bekannte Handelstage (tz-aware, z. B. Datumsachse des
+        INTERIM-Panels); ersetzt die erneute Kalenderberechnung.
+    session : requests.Session, optional
+        HTTP-Session; ``None`` nutzt die modulweite Keep-Alive-Session.
+    cache_dir : Path, optional
+        Verzeichnis für den Antwort-Cache; ``None`` schaltet ihn ab.
+    cache_ttl : float, optional
+        Höchstalter wiederverwendeter Antworten in Sekunden (``math.inf`` = unbegrenzt).
 
     Returns
     -------
@@ -78,36 +141,71 @@ def fetch_fred_nyse_daily(
     if end is None:  # falls kein Enddatum angegeben wurde
         end = pd.Timestamp.today(tz="UTC").date().isoformat()  # heutiges Datum in ISO-Form
 
-    # --- FRED abrufen ---
-    params = {  # Parameter für HTTP-GET
-        "series_id": series_id,
-        "observation_start": start,
-        "observation_end": end,
-        "file_type": "json",
-        "api_key": api_key,
-    }
-    resp = requests.get(FRED_URL, params=params, timeout=30)  # GET-Request mit Timeout
-    resp.raise_for_status()  # Fehler werfen, falls Status != 200
-    data = resp.json()  # JSON-Antwort parsen
-    obs = pd.DataFrame(data.get("observations", []))  # Observations in DataFrame
-    if obs.empty:  # keine Daten zurückbekommen
+    s = _fetch_fred_observations(series_id, start, end, api_key, session, cache_dir, cache_ttl)  # FRED abrufen (oder Cache)
+    if s.empty:  # keine Daten zurückbekommen
         return pd.Series(name=series_id, dtype="float64")  # leere Serie
 
-    # --- in Series (Prozent p.a.) ---
-    obs["value"] = pd.to_numeric(obs["value"].replace(".", pd.NA), errors="coerce")  # Prozentwerte in float umwandeln
-    obs["date"]  = pd.to_datetime(obs["date"], utc=True).dt.tz_localize(None)  # Datum ohne Zeitzone
-    s = pd.Series(obs["value"].values, index=obs["date"].values, name=series_id).sort_index()  # sortierte Series
-
     # --- NYSE-Handelstage  + Reindex  ---
-    cal_idx = nyse_trading_days(start=s.index.min().date().isoformat(), end=end, tz=tz)  # Handelskalender erzeugen
-    df = align_to_trading_days(s.to_frame(), cal_idx)  # Reindex auf Kalender
+    if sessions is not None:  # Sessions vom Aufrufer übernehmen
+        cal_idx = sessions
+    else:
+        cal_idx = nyse_trading_days(start=s.index.min().date().isoformat(), end=end, tz=tz)  # Handelskalender erzeugen
+    return _fill(s.reindex(cal_idx), fill)  # Reindex direkt auf der Series (ohne DataFrame-Umweg) + Auffüllen
+
+def fetch_fred_nyse_daily_batch(
+    series_ids: List[str],
+    start: str = "1990-01-01",
+    end: Optional[str] = None,
+    api_key: Optional[str] = None,
+    fill: str = "ffill",
+    tz: str = "UTC",
+    sessions: Optional[pd.DatetimeIndex] = None,
+    n_jobs: int = 8,
+    session: Optional[requests.Session] = None,
+    cache_dir: Optional[Path] = FRED_CACHE_DIR,
+    cache_ttl: float = CACHE_TTL_SEC,
+) -> pd.DataFrame:
+    """Mehrere FRED-Serien parallel holen und gemeinsam auf NYSE-Sessions legen.
+
+    Die Abrufe sind voneinander unabhängig und netzwerkgebunden; sie laufen in
+    einem Thread-Pool über eine gemeinsame Keep-Alive-Session. API-Key,
+    Kalender und Reindex werden nur einmal für alle Serien bestimmt.
 
-    if fill == "ffill":  # vorne auffüllen
-        df[series_id] = df[series_id].ffill()
-    elif fill == "bfill":  # hinten auffüllen
-        df[series_id] = df[series_id].bfill()
+    Parameters
+    ----------
+    series_ids : List[str]
+        FRED-Serienkennzeichen (z. B. ``["DGS3MO", "DFF"]``).
+    start, end, api_key, fill, tz, sessions, session, cache_dir, cache_ttl
+        Wie bei ``fetch_fred_nyse_daily``; ohne ``sessions`` beginnt der
+        Kalender bei der frühesten Beobachtung aller Serien.
+    n_jobs : int, optional
+        Anzahl paralleler Abrufe.
 
-    return df[series_id]  # Series mit Tageszinsen
+    Returns
+    -------
+    pd.DataFrame
+        Eine Spalte je Serie (Reihenfolge wie ``series_ids``); Serien ohne
+        Beobachtungen bleiben als NaN-Spalte erhalten.
+    """
+    api_key = _resolve_fred_api_key(api_key)  # Key einmal für alle Serien
+    if end is None:
+        end = pd.Timestamp.today(tz="UTC").date().isoformat()
+    ids = list(dict.fromkeys(series_ids))  # Duplikate nur einmal abrufen
+    http = session or SESSION  # ein Verbindungspool für alle Threads
+
+    with ThreadPoolExecutor(max_workers=max(1, min(n_jobs, len(ids) or 1))) as pool:
+        # JSON-Parsing und Umwandlung laufen im jeweiligen Worker
+        series = dict(zip(ids, pool.map(lambda sid: _fetch_fred_observations(sid, start, end, api_key, http, cache_dir, cache_ttl), ids)))
+    series = {sid: s for sid, s in series.items() if not s.empty}
+    if not series:  # keine Serie hat Daten geliefert
+        return pd.DataFrame(columns=ids, dtype="float64")
+
+    wide = pd.DataFrame(series)  # äußere Vereinigung der Beobachtungstage
+    if sessions is not None:
+        cal_idx = sessions
+    else:
+        cal_idx = nyse_trading_days(start=wide.index.min().date().isoformat(), end=end, tz=tz)  # ein Kalender für alle
+    return _fill(align_to_trading_days(wide, cal_idx), fill).reindex(columns=ids)  # leere Serien als NaN-Spalten
 
 def annual_pct_to_daily_rate(y_annual_pct: pd.Series, basis: int = 360) -> pd.Series:
     """Prozentangaben p.a. in tägliche einfache Rate (dezimal) umwandeln.
@@ -138,6 +138,27 @@ def moving_average_convergence_divergence(close: pd.Series, fast: int = 12, slow
     """
     ema_fast = exponential_moving_average(close, fast)  # schnelle EMA
     ema_slow = exponential_moving_average(close, slow)  # langsame EMA
+    return macd_from_emas(ema_fast, ema_slow, signal)  # Linie, Signal, Histogramm
+
+
+def macd_from_emas(ema_fast: pd.Series, ema_slow: pd.Series, signal: int = 9):
+    """MACD aus bereits berechneten EMAs ableiten.
+
+    Erspart zwei weitere ``ewm``-Durchläufe über die Kurse, wenn die EMAs
+    ohnehin als eigene Features vorliegen.
+
+    Parameters
+    ----------
+    ema_fast, ema_slow : pd.Series
+        Schnelle und langsame EMA der Schlusskurse.
+    signal : int, optional
+        EMA-Periode der Signallinie.
+
+    Returns
+    -------
+    tuple[pd.Series, pd.Series, pd.Series]
+        MACD-Linie, Signallinie und Histogramm.
+    """
     macd = ema_fast - ema_slow  # Differenz = MACD-Linie
     macd_signal = exponential_moving_average(macd, signal)  # Signallinie
     macd_hist = macd - macd_signal  # Histogramm als Differenz
@@ -169,6 +190,42 @@ def bollinger(close: pd.Series, window: int = 20, n_std: float = 2.0):
     return mid, upper, lower, width  # vier Serien zurückgeben
 
 
+def _rolling_mean_abs_dev(s, window: int, block: int = 4096):
+    """Gleitende mittlere absolute Abweichung vom Fenstermittel, vektorisiert.
+
+    Ersetzt ``rolling(...).apply(lambda ...)`` (ein Python-Aufruf je Fenster)
+    durch ``sliding_window_view``; die Fenster werden blockweise über die Zeit
+    ausgewertet, damit das Zwischenarray (Zeilen × Spalten × Fenster) begrenzt
+    bleibt. Fenster mit NaN ergeben NaN (wie ``min_periods=window``).
+
+    Parameters
+    ----------
+    s : pd.Series | pd.DataFrame
+        Eingangsreihe(n), Zeit entlang der Zeilen.
+    window : int
+        Fensterlänge.
+    block : int, optional
+        Anzahl Fenster je Auswertungsblock.
+
+    Returns
+    -------
+    pd.Series | pd.DataFrame
+        MAD im Format der Eingabe; die ersten ``window - 1`` Zeilen sind NaN.
+    """
+    vals = s.to_numpy(dtype=np.float64)  # Zeit × Spalten bzw. Zeit
+    mat = vals.reshape(len(vals), -1)  # Series → eine Spalte (View)
+    out = np.full(mat.shape, np.nan)
+    if len(mat) >= window:
+        win = np.lib.stride_tricks.sliding_window_view(mat, window, axis=0)  # (Fenster, Spalten, window), ohne Kopie
+        for a in range(0, len(win), block):
+            w = win[a:a + block]
+            out[window - 1 + a:window - 1 + a + len(w)] = np.abs(w - w.mean(axis=-1, keepdims=True)).mean(axis=-1)
+    out = out.reshape(vals.shape)
+    if isinstance(s, pd.DataFrame):
+        return pd.DataFrame(out, index=s.index, columns=s.columns)
+    return pd.Series(out, index=s.index, name=s.name)
+
+
 def commodity_channel_index(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 20) -> pd.Series:
     """CCI: Abweichung vom gleitenden Durchschnitt in Einheiten MAD.
 
@@ -186,45 +243,44 @@ def commodity_channel_index(high: pd.Series, low: pd.Series, close: pd.Series, p
     """
     tp = (high + low + close) / 3.0  # Typical Price als Mittel der Extrema
     sma_tp = tp.rolling(window=period, min_periods=period).mean()  # gleitender Mittelwert
-    mad = tp.rolling(window=period, min_periods=period).apply(
-        lambda x: np.mean(np.abs(x - x.mean())), raw=False  # mittlere absolute Abweichung
-    )
+    mad = _rolling_mean_abs_dev(tp, period)  # mittlere absolute Abweichung je Fenster
     denom = 0.015 * mad.replace(0, np.nan)  # Skalierungskonstante 0.015
     cci_val = (tp - sma_tp) / denom  # Normierte Abweichung
-    cci_val.name = f"cci_{period}"  # sprechender Name
+    if isinstance(cci_val, pd.Series):  # breite DataFrames behalten ihre Asset-Spalten
+        cci_val.name = f"cci_{period}"  # sprechender Name
     return cci_val  # Serie zurück
 
-def average_directional_index(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.DataFrame:
-    """ADX samt positiver/negativer Richtungsindizes berechnen.
+def directional_movement_index(high, low, close, period: int = 14):
+    """ADX sowie positive/negative Richtungsindizes als einzelne Serien.
+
+    Arbeitet spaltenweise und akzeptiert daher auch breite DataFrames
+    (Datum × Asset), womit alle Assets in einem Durchlauf berechnet werden.
 
     Parameters
     ----------
-    high, low, close : pd.Series
+    high, low, close : pd.Series | pd.DataFrame
         Hoch-, Tief- und Schlusskurse.
     period : int, optional
         Fensterlänge.
 
     Returns
     -------
-    pd.DataFrame
-        Enthält ADX sowie positive/negative Richtungsindizes.
+    tuple
+        ADX, +DI und -DI im Format der Eingabe.
     """
 
     # True Range
     prev_close = close.shift(1)  # Vortagesschluss zum TR-Vergleich
-    tr = pd.concat([
-        high - low,  # interne Spanne
-        (high - prev_close).abs(),  # Abstand High zu prev_close
-        (low - prev_close).abs()  # Abstand Low zu prev_close
-    ], axis=1).max(axis=1)  # max der drei Komponenten
+    tr = np.fmax(  # fmax ignoriert NaN wie ``max(axis=1)`` (erste Zeile = high - low)
+        np.fmax(high - low, (high - prev_close).abs()),  # interne Spanne vs. Abstand High
+        (low - prev_close).abs(),  # Abstand Low zu prev_close
+    )
 
     # Directional Movements
     up_move = high.diff()  # Aufwärtsbewegung
     down_move = -low.diff()  # Abwärtsbewegung (negiert)
-    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)  # positives DM
-    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)  # negatives DM
-    plus_dm = pd.Series(plus_dm, index=high.index)  # zurück in Series-Form
-    minus_dm = pd.Series(minus_dm, index=high.index)
+    plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0.0)  # positives DM
+    minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0.0)  # negatives DM
 
     # Wilder smoothing via EMA(alpha=1/period)
     alpha = 1.0 / period  # Glättungsfaktor
@@ -233,13 +289,32 @@ def average_directional_index(high: pd.Series, low: pd.Series, close: pd.Series,
     minus_dm_sm = minus_dm.ewm(alpha=alpha, adjust=False, min_periods=period).mean()  # geglättetes -DM
 
     # DIs
-    eps = 1e-12  # numerischer Schutz gegen Division durch 0
-    plus_di = 100.0 * (plus_dm_sm / (tr_sm.replace(0, np.nan)))  # +DI in %
-    minus_di = 100.0 * (minus_dm_sm / (tr_sm.replace(0, np.nan)))  # -DI in %
+    tr_den = tr_sm.replace(0, np.nan)  # Nenner einmal bilden, für beide DIs
+    plus_di = 100.0 * (plus_dm_sm / tr_den)  # +DI in %
+    minus_di = 100.0 * (minus_dm_sm / tr_den)  # -DI in %
 
     # DX and ADX
     dx = 100.0 * (plus_di - minus_di).abs() / ((plus_di + minus_di).replace(0, np.nan))  # Differenzmaß
     adx_val = dx.ewm(alpha=alpha, adjust=False, min_periods=period).mean()  # ADX-Glättung
+    return adx_val, plus_di, minus_di  # drei Serien zurückgeben
+
+
+def average_directional_index(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.DataFrame:
+    """ADX samt positiver/negativer Richtungsindizes berechnen.
+
+    Parameters
+    ----------
+    high, low, close : pd.Series
+        Hoch-, Tief- und Schlusskurse.
+    period : int, optional
+        Fensterlänge.
+
+    Returns
+    -------
+    pd.DataFrame
+        Enthält ADX sowie positive/negative Richtungsindizes.
+    """
+    adx_val, plus_di, minus_di = directional_movement_index(high, low, close, period)  # Kernrechnung
 
     out = pd.DataFrame({  # Ergebnisse bündeln
         f"adx_{period}": adx_val,
@@ -5,26 +5,31 @@ from typing import Optional
 
 
 # ------------------------- rechnet halben Spread aus -------------------------
+def _half_spread_price_np(p_ref: np.ndarray, side: np.ndarray, spread: np.ndarray) -> np.ndarray:
+    """NumPy-Kern von ``half_spread_price`` (Eingaben bereits bereinigt, keine Index-Ausrichtung)."""
+    half = 0.5 * spread
+    return p_ref * np.where(side >= 0, 1.0 + half, 1.0 - half)
+
+
 def half_spread_price(p_ref: pd.Series, side: pd.Series, spread: pd.Series) -> pd.Series:
     """
     Half-Spread-Adjust:
       Buy (side>0):  p_exec = p_ref * (1 + 0.5*spread)
       Sell(side<0):  p_exec = p_ref * (1 - 0.5*spread)
     """
-    side = side.fillna(0)
-    spread = spread.fillna(0).clip(lower=0)
-    adj = np.where(side >= 0, 1.0 + 0.5*spread, 1.0 - 0.5*spread)
-    return p_ref * adj
+    side = side.fillna(0).to_numpy()
+    spread = np.fmax(spread.to_numpy(dtype=np.float64, na_value=np.nan), 0.0)  # NaN/negativ → 0
+    p_exec = _half_spread_price_np(p_ref.to_numpy(dtype=np.float64, na_value=np.nan), side, spread)
+    return pd.Series(p_exec, index=p_ref.index, name=p_ref.name)
 
 
 # ------------------------- Rundet Stücke: Käufe floor, Verkäufe ceil (Standard: ganze Stücke) -------------------------
 def round_shares(q: pd.Series, lot: int = 1) -> pd.Series:
-    q = q.fillna(0.0)
-    out = pd.Series(0.0, index=q.index)
-    buy, sell = q > 0, q < 0
-    out[buy]  = np.floor(q[buy]  / lot) * lot
-    out[sell] = np.ceil( q[sell] / lot) * lot
-    return out
+    arr = q.to_numpy(dtype=np.float64, na_value=np.nan)
+    # trunc = floor für Käufe, ceil für Verkäufe (Richtung 0) in einem Durchlauf; +0.0 tilgt -0.0
+    out = np.trunc(arr / lot) * lot + 0.0
+    out[np.isnan(out)] = 0.0  # fehlende Orders → 0 Stück
+    return pd.Series(out, index=q.index)
 
 
 
@@ -50,28 +55,35 @@ def apply_execution(
       ['q','p_ref','p_exec','notional_abs','spread_cost']
     """
     idx = orders.index
-    q_raw = orders[order_col].reindex(idx).fillna(0.0)
-    q = round_shares(q_raw, lot=lot_size)
+    q = round_shares(orders[order_col], lot=lot_size)  # NaN → 0 Stück
 
+    # Benötigte Preisspalten einmal gemeinsam auf den Order-Index ausrichten (eine Indexauflösung)
     p_ref_col = "exec_ref_tplus1" if use_tplus1 else "open"
-    p_ref = prices[p_ref_col].reindex(idx)
+    cols = [p_ref_col]
+    if use_cs_spread and "spread_cs" in prices.columns:
+        cols.append("spread_cs")
+    aligned = prices[cols].reindex(idx)
 
-    if use_cs_spread:
-        spread = prices.get("spread_cs", 0).reindex(idx).fillna(0.0).clip(lower=0.0)
+    if len(cols) == 2:
+        s = np.fmax(aligned["spread_cs"].to_numpy(dtype=np.float64, na_value=np.nan), 0.0)  # NaN/negativ → 0
+    elif not use_cs_spread and fixed_spread_bps is not None:
+        s = np.full(len(idx), float(fixed_spread_bps) / 1e4)
     else:
-        spread = pd.Series(0.0, index=idx)
-        if fixed_spread_bps is not None:
-            spread = pd.Series(float(fixed_spread_bps) / 1e4, index=idx)
+        s = np.zeros(len(idx))  # kein Spread
 
-    p_exec = half_spread_price(p_ref, q, spread)
-    notional_abs = (q.abs() * p_exec).astype(float)
-    spread_cost  = (q.abs() * p_ref * 0.5 * spread).astype(float)
+    # Arithmetik auf ndarrays, ein DataFrame am Ende statt Zwischen-Series
+    q_arr = q.to_numpy()
+    p_arr = aligned[p_ref_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    p_exec = _half_spread_price_np(p_arr, q_arr, s)  # halber Spread je Richtung
+    abs_q = np.abs(q_arr)
 
     out = pd.DataFrame({
-        "q": q,
-        "p_ref": p_ref,
+        "q": q_arr,
+        "p_ref": p_arr,
         "p_exec": p_exec,
-        "notional_abs": notional_abs,
-        "spread_cost": spread_cost,
-    }).sort_index()
+        "notional_abs": abs_q * p_exec,
+        "spread_cost": abs_q * p_arr * 0.5 * s,
+    }, index=idx)
+    if not idx.is_monotonic_increasing:
+        out = out.sort_index()
     return out
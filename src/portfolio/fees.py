@@ -1,11 +1,12 @@
 from __future__ import annotations
 import pandas as pd
-import yaml
 from pathlib import Path
 from typing import Dict, Optional
 
+from src.utils.paths import load_yaml  # memoisiertes YAML-Lesen (libyaml, falls vorhanden)
+
 def load_costs(costs_path: Path | str) -> Dict:
-    return yaml.safe_load(Path(costs_path).read_text(encoding="utf-8"))
+    return load_yaml(costs_path)
 
 def _bps(x: float) -> float:
     return float(x) / 1e4
@@ -24,6 +25,13 @@ def apply_fees(
     """
     out = trades.copy()
 
+    # Kostenfreie Konfiguration (Default im RL-Training): nur der Spread zählt, keine Arithmetik
+    if not commission_bps and not (use_vol_slippage and sigma_hl is not None):
+        out["fees"] = 0.0
+        out["vol_slip"] = 0.0
+        out["total_cost"] = out["spread_cost"]
+        return out
+
     # Kommission
     fees = out["notional_abs"] * _bps(commission_bps)
     out["fees"] = fees
@@ -0,0 +1,103 @@
+# ---------------------------------------------------------------------------
+# Datei: src/utils/http_cache.py
+# Zweck: Gemeinsame HTTP-Infrastruktur der Datenquellen (Tiingo, FRED):
+#   Keep-Alive-Session mit Retries und ein gzip-JSON-Plattencache je Anfrage.
+# Hauptfunktionen: ``make_session``, ``cached_get_json``, ``cache_path``,
+#   ``ttl_seconds`` und ``json_loads``; ``SESSION`` ist die modulweit geteilte Session.
+# Abhängigkeiten: ``requests``/``urllib3``; optional ``orjson`` für schnelleres
+#   Dekodieren der JSON-Antworten.
+# Edge Cases: parallele Schreiber (atomares ``os.replace``), abgelaufene
+#   Einträge, API-Keys in Query-Parametern.
+# ---------------------------------------------------------------------------
+"""
+HTTP-Session und Antwort-Cache für alle API-Abrufe der Pipeline.
+Einträge gelten standardmäßig ``CACHE_TTL_SEC`` lang, auch für historische
+Fenster: Tiingo rechnet adjustierte Felder nach späteren Splits/Dividenden
+rückwirkend um, FRED revidiert jüngere Beobachtungen. Die Gültigkeit ist je
+Quelle konfigurierbar (``cache.ttl_sec`` in ``data_spec.yml``); ``null``
+hält Einträge unbegrenzt, dann laufen Warmläufe ohne Netzwerk.
+"""
+from __future__ import annotations  # zukünftige Typ-Hints ermöglichen
+
+import gzip  # komprimierte Cache-Dateien
+import hashlib  # Cache-Schlüssel aus Endpunkt und Parametern
+import json  # stabile Schlüssel-Serialisierung, Fallback-Parser
+import math  # unbegrenzte Gültigkeit als ``math.inf``
+import os  # atomares Ersetzen, Prozess-ID für Temporärdateien
+import threading  # Thread-ID für Temporärdateien
+import time  # Alter der Cache-Einträge
+from pathlib import Path  # Cache-Verzeichnisse
+from typing import Optional  # optionale Parameter
+
+import requests  # HTTP-Client
+from requests.adapters import HTTPAdapter  # Verbindungspool je Host
+from urllib3.util.retry import Retry  # Wiederholungen bei Rate-Limit/Serverfehlern
+
+try:
+    import orjson  # schneller JSON-Parser (C/Rust), liefert dieselben list[dict]
+    json_loads = orjson.loads  # akzeptiert bytes direkt
+except ImportError:  # orjson ist optional
+    json_loads = json.loads  # Standardbibliothek als Fallback
+
+__all__ = ["CACHE_TTL_SEC", "SESSION", "make_session", "cache_path", "cached_get_json", "ttl_seconds", "json_loads"]
+
+# Standard-Höchstalter für wiederverwendete Antworten (und RAW-Dateien), auch für historische Fenster
+CACHE_TTL_SEC = 3600
+
+# Query-Parameter mit Zugangsdaten: nie Teil des Cache-Schlüssels
+_SECRET_PARAMS = frozenset({"api_key", "token"})
+
+def make_session() -> requests.Session:
+    """HTTP-Session mit Keep-Alive-Pool und Retries für alle API-Aufrufe."""
+    session = requests.Session()  # wiederverwendete TCP/TLS-Verbindungen statt Handshake je Anfrage
+    retry = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])  # exponentielles Backoff
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry))
+    return session
+
+SESSION = make_session()  # modulweit geteilt (auch von Download-Threads)
+
+def ttl_seconds(value) -> float:
+    """Gültigkeit aus der Konfiguration in Sekunden; ``None`` bedeutet unbegrenzt."""
+    return math.inf if value is None else float(value)
+
+def cache_path(cache_dir: Path, url: str, params: dict) -> Path:
+    """Inhaltsadressierter Cache-Pfad aus Endpunkt und Query-Parametern (ohne Zugangsdaten)."""
+    items = sorted((k, v) for k, v in params.items() if k not in _SECRET_PARAMS)  # Key/Token gehören nicht in den Schlüssel
+    key = json.dumps([url, items]).encode("utf-8")  # stabile Serialisierung
+    return cache_dir / f"{hashlib.sha1(key).hexdigest()}.json.gz"
+
+def cached_get_json(session, url: str, params: dict, headers: dict, cache_dir: Optional[Path],
+                    ttl: float = CACHE_TTL_SEC):
+    """GET mit Plattencache; Einträge gelten ``ttl`` Sekunden lang, unabhängig vom Fenster.
+
+    Parameters
+    ----------
+    session : requests.Session
+        Session (oder Objekt mit kompatiblem ``get``).
+    url : str
+        Endpunkt.
+    params, headers : dict
+        Query-Parameter und HTTP-Header der Anfrage.
+    cache_dir : Path | None
+        Cache-Verzeichnis; ``None`` schaltet den Cache ab.
+    ttl : float, optional
+        Höchstalter eines Eintrags in Sekunden; ``math.inf`` = unbegrenzt.
+
+    Returns
+    -------
+    Any
+        Dekodierte JSON-Antwort.
+    """
+    path = cache_path(cache_dir, url, params) if cache_dir is not None else None
+    if path is not None and path.exists():
+        if time.time() - path.stat().st_mtime < ttl:  # Quellen können rückwirkend umrechnen/revidieren
+            with gzip.open(path, "rb") as f:
+                return json_loads(f.read())  # Treffer: kein Netzwerkzugriff
+    r = session.get(url, params=params, headers=headers, timeout=30); r.raise_for_status()  # GET-Anfrage mit Timeout, Fehler bei HTTP!=200
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")  # eindeutig je Thread
+        with gzip.open(tmp, "wb") as f:
+            f.write(r.content)  # Rohantwort unverändert ablegen
+        os.replace(tmp, path)  # atomar: Leser sehen nie halbe Dateien
+    return json_loads(r.content)  # Rohbytes direkt dekodieren (gzip-Transfer entpackt ``requests``)
@@ -9,6 +9,7 @@
 # Edge Cases: fehlende Parquet-Unterstützung oder nicht-git-Repositories.
 # ---------------------------------------------------------------------------
 import json, hashlib, os, sys, platform, subprocess  # IO, Hashing und Systeminfo
+from functools import lru_cache  # Memoisierung unveränderter Dateien
 import pandas as pd  # Lesen von Parquet-Dateien
 
 def sha256_file(path: str, chunk_size: int = 1<<20) -> str:
@@ -20,7 +21,17 @@ def sha256_file(path: str, chunk_size: int = 1<<20) -> str:
     return h.hexdigest()  # finale hexadezimale Prüfsumme
 
 def file_summary(path: str) -> dict:
-    """Erzeuge Kurzbeschreibung einer Datei (insb. Parquet)."""
+    """Erzeuge Kurzbeschreibung einer Datei (insb. Parquet).
+
+    Memoisiert über ``(Pfad, mtime_ns, Größe)``: unveränderte Dateien werden
+    bei wiederholten Pipeline-Läufen weder neu gelesen noch neu gehasht.
+    """
+    st = os.stat(path)  # Änderungszeit und Größe als Cache-Schlüssel
+    return dict(_file_summary_cached(path, st.st_mtime_ns, st.st_size))  # Kopie schützt den Cache
+
+@lru_cache(maxsize=256)
+def _file_summary_cached(path: str, mtime_ns: int, size: int) -> dict:
+    """Eigentliche Zusammenfassung; Schlüsselargumente nur für den Cache."""
     # Für Parquet: Zeilen/Spalten/Datumsscope grob ermitteln
     try:  # Parquet lesen – kann bei Nicht-Parquet-Dateien fehlschlagen
         df = pd.read_parquet(path)  # DataFrame laden
@@ -31,8 +42,8 @@ def file_summary(path: str) -> dict:
             "n_cols": int(len(df.columns)),
         }
         if "date" in getattr(df.index, "names", []) or "date" in df.columns:
-            d = df.reset_index()  # Index in Spalten überführen
-            dates = d["date"] if "date" in d else d.set_index(df.index.names)["date"]
+            # Datumswerte direkt aus Spalte bzw. Indexebene (``reset_index`` würde das ganze Panel kopieren)
+            dates = df["date"] if "date" in df.columns else df.index.get_level_values("date")
             out["date_min"] = str(pd.to_datetime(dates.min()).date())  # frühestes Datum
             out["date_max"] = str(pd.to_datetime(dates.max()).date())  # spätestes Datum
         return out  # vollständiges Summary zurückgeben
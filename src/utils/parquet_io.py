@@ -2,17 +2,29 @@
 # Datei: src/utils/parquet_io.py
 # Zweck: Robuste Ein-/Ausgabefunktionen für Parquet-Dateien mit Fallback auf
 #   unterschiedliche Engines.
-# Hauptfunktionen: ``save_parquet`` und ``load_parquet``.
-# Abhängigkeiten: ``pandas`` sowie ``pathlib`` für Pfadmanipulation.
+# Hauptfunktionen: ``save_parquet``, ``save_parquet_chunked``, ``load_parquet``
+#   (mit Spalten-/Filter-Pushdown) und ``parquet_column_types``.
+# Abhängigkeiten: ``pandas`` sowie ``pathlib`` für Pfadmanipulation; optional
+#   ``pyarrow`` (bevorzugte Schreib-Engine, gestreamtes Schreiben großer Panels).
 # Edge Cases: fehlende fastparquet/pyarrow-Installation oder nicht existente
 #   Verzeichnisse.
 # ---------------------------------------------------------------------------
 from __future__ import annotations  # zukünftige Typ-Hints ermöglichen
+from functools import lru_cache  # Footer-Cache je Dateistand
 from pathlib import Path  # objektorientierte Pfadbehandlung
-from typing import Union  # Union für Pfadtypen (str/Path)
+from typing import Dict, List, Optional, Union  # Typen für Pfade, Spalten und Filter
+import numpy as np  # Chunk-Grenzen auf Datumswerten
 import pandas as pd  # DataFrame-IO
 
-__all__ = ["save_parquet", "load_parquet"]  # Exportierte Funktionen
+# pyarrow ist optional; ohne pyarrow schreiben beide Speicherfunktionen über fastparquet
+try:
+    import pyarrow as pa  # Arrow-Tabellen/RecordBatches
+    import pyarrow.parquet as pq  # ParquetWriter für Row-Group-Streaming
+    HAVE_PYARROW = True
+except ImportError:  # pragma: no cover - abhängig von der Umgebung
+    HAVE_PYARROW = False
+
+__all__ = ["save_parquet", "save_parquet_chunked", "load_parquet", "parquet_column_types"]  # Exportierte Funktionen
 
 def _ensure_parent_dir(path: Path) -> None:
     """Create parent directories for the given path if they do not exist."""
@@ -20,40 +32,155 @@ def _ensure_parent_dir(path: Path) -> None:
     if parent and not parent.exists():  # nur bei fehlendem Verzeichnis aktiv
         parent.mkdir(parents=True, exist_ok=True)  # rekursiv anlegen
 
-def save_parquet(df: pd.DataFrame, path: Union[str, Path]) -> None:
+# Kompressionsstufe für zstd (Arrow-Default wäre 1); Codecs ohne Stufen ignorieren sie
+ZSTD_LEVEL = 3
+
+def _compression_level(compression: str) -> Optional[int]:
+    """Stufe nur für zstd setzen (snappy & Co. kennen keine Stufe)."""
+    return ZSTD_LEVEL if compression.lower() == "zstd" else None
+
+def save_parquet(df: "pd.DataFrame | pa.Table", path: Union[str, Path], compression: str = "zstd") -> None:
     """
     Speichert ein pandas DataFrame als Parquet-Datei mit stabiler Engine-Auswahl.
-    - Erst fastparquet probieren, sonst pyarrow.
-    - Index wird standardmäßig gespeichert.
-    
+    - Erst pyarrow (ein ``write_table`` über einen gepufferten Dateistrom),
+      sonst fastparquet.
+    - Index wird wie bei ``DataFrame.to_parquet`` gespeichert.
+    - Eine ``pyarrow.Table`` wird unverändert geschrieben (keine pandas-Konvertierung).
+    - Eine Row Group je Datei (Einzel-Assets sind klein), Dictionary-Encoding,
+      zstd mit Stufe ``ZSTD_LEVEL``.
+
     Parameters
     ----------
-    df : pd.DataFrame
+    df : pd.DataFrame | pyarrow.Table
         Zu speichernde Tabelle.
     path : str | Path
         Zieldatei.
+    compression : str
+        Parquet-Kompression der Spaltenseiten.
     """
     p = Path(path)  # Pfadobjekt erzeugen
     _ensure_parent_dir(p)  # sicherstellen, dass Verzeichnis existiert
-    try:  # bevorzugte Engine fastparquet
-        df.to_parquet(p, engine="fastparquet")  # schreiben
-    except Exception as e_fast:  # Fallback auf pyarrow
+    errors = []
+    if HAVE_PYARROW:  # bevorzugt: pyarrow schreibt kleine Dateien mit wenigen Syscalls
         try:
-            df.to_parquet(p, engine="pyarrow")  # alternative Engine
-        except Exception as e_arrow:  # beide fehlgeschlagen → Fehler melden
-            raise RuntimeError(
-                f"Parquet speichern fehlgeschlagen. "
-                f"fastparquet: {e_fast}, pyarrow: {e_arrow}"
-            )
+            table = df if isinstance(df, pa.Table) else pa.Table.from_pandas(df, preserve_index=None)  # Index-Semantik wie ``to_parquet``
+            with pa.output_stream(str(p), buffer_size=1 << 20) as out:  # 1 MiB Puffer vor dem Dateisystem
+                pq.write_table(
+                    table, out, compression=compression, compression_level=_compression_level(compression),
+                    use_dictionary=True, row_group_size=max(table.num_rows, 1),  # eine Row Group je Datei
+                )
+            return
+        except Exception as e_arrow:  # z. B. nicht abbildbare Objektspalten
+            errors.append(f"pyarrow: {e_arrow}")
+    try:  # Fallback fastparquet
+        df.to_parquet(p, engine="fastparquet", compression=compression.upper())  # schreiben
+    except Exception as e_fast:  # beide fehlgeschlagen → Fehler melden
+        errors.append(f"fastparquet: {e_fast}")
+        raise RuntimeError(f"Parquet speichern fehlgeschlagen. {', '.join(errors)}")
+
+def save_parquet_chunked(
+    df: pd.DataFrame,
+    path: Union[str, Path],
+    level: str = "date",
+    compression: str = "zstd",
+    schema: "pa.Schema | None" = None,
+) -> None:
+    """
+    Speichert ein nach Datum sortiertes Panel jahresweise als Row Groups.
+    - Ein ``pyarrow.parquet.ParquetWriter`` schreibt je Kalenderjahr eine
+      Arrow-Tabelle; das Gesamtpanel wird nie als Arrow-Kopie gehalten.
+    - Ohne pyarrow wird auf ``save_parquet`` zurückgefallen.
 
-def load_parquet(path: Union[str, Path]) -> pd.DataFrame:
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Panel mit Datumsebene ``level`` im Index, aufsteigend sortiert.
+    path : str | Path
+        Zieldatei.
+    level : str
+        Indexebene mit den Zeitstempeln, nach der gestückelt wird.
+    compression : str
+        Parquet-Kompression der Spaltenseiten.
+    schema : pyarrow.Schema | None
+        Vorab deklariertes Schema; ``None`` leitet es einmal aus dem ersten
+        Chunk ab (statt die Typen des ganzen Panels zu inferieren).
     """
-    Lädt eine Parquet-Datei stabil (fastparquet bevorzugt, sonst pyarrow).
+    if not HAVE_PYARROW or df.empty:
+        save_parquet(df, path)  # nichts zu streamen bzw. Engine fehlt
+        return
+    p = Path(path)  # Pfadobjekt erzeugen
+    _ensure_parent_dir(p)  # sicherstellen, dass Verzeichnis existiert
+
+    years = df.index.get_level_values(level).year.to_numpy()  # Jahr je Zeile
+    cuts = np.flatnonzero(np.diff(years)) + 1  # Zeilen, an denen ein neues Jahr beginnt
+    bounds = np.concatenate(([0], cuts, [len(df)]))  # Chunk-Grenzen inkl. Anfang/Ende
+
+    if schema is None:  # Typen stehen nach dem Downcast fest → einmal deklarieren
+        schema = pa.Schema.from_pandas(df.iloc[bounds[0]:bounds[1]], preserve_index=True)  # inkl. pandas-Metadaten
+    with pq.ParquetWriter(
+        p, schema, compression=compression, compression_level=_compression_level(compression), use_dictionary=True,
+    ) as writer:
+        for start, stop in zip(bounds[:-1], bounds[1:]):  # Jahr für Jahr
+            # ``safe=False``: keine Bereichsprüfung, die dtypes kontrolliert der Erzeuger
+            table = pa.Table.from_pandas(df.iloc[start:stop], schema=schema, preserve_index=True, safe=False)
+            writer.write_table(table)  # eigene Row Group(s) je Jahr
+
+
+def parquet_column_types(path: Union[str, Path]) -> Dict[str, str]:
+    """
+    Spaltennamen und Typen aus dem Parquet-Footer lesen, ohne Daten zu dekodieren.
+
+    Memoisiert über ``(Pfad, mtime_ns, Größe)``: wiederholte INTERIM-Builds
+    parsen den Footer unveränderter RAW-Dateien nicht erneut.
+
+    Parameters
+    ----------
+    path : str | Path
+        Dateipfad der Parquet-Datei.
+
+    Returns
+    -------
+    Dict[str, str]
+        Spaltenname → Typbezeichnung (z. B. ``"string"``, ``"timestamp[ns, tz=UTC]"``).
+    """
+    p = Path(path).resolve()  # eindeutiger Schlüssel für den Cache
+    st = p.stat()  # Änderungszeit und Größe erkennen neu geschriebene Dateien
+    return dict(_column_types_cached(str(p), st.st_mtime_ns, st.st_size))  # Kopie schützt den Cache
+
+@lru_cache(maxsize=1024)
+def _column_types_cached(path: str, mtime_ns: int, size: int) -> Dict[str, str]:
+    """Footer tatsächlich lesen; Schlüsselargumente nur für den Cache."""
+    if HAVE_PYARROW:  # Footer direkt über pyarrow
+        schema = pq.read_schema(path)
+        index_cols = set()  # gespeicherte pandas-Indexspalten sind keine Datenspalten
+        meta = schema.pandas_metadata or {}
+        for c in meta.get("index_columns", []):
+            if isinstance(c, str):
+                index_cols.add(c)
+        return {f.name: str(f.type) for f in schema if f.name not in index_cols}
+    import fastparquet  # Fallback ohne pyarrow
+    return {name: str(dt) for name, dt in fastparquet.ParquetFile(path).dtypes.items()}
+
+def load_parquet(
+    path: Union[str, Path],
+    columns: Optional[List[str]] = None,
+    filters: Optional[list] = None,
+) -> pd.DataFrame:
+    """
+    Lädt eine Parquet-Datei stabil (pyarrow bevorzugt, sonst fastparquet).
+
+    Gleiche Reihenfolge wie beim Schreiben: fastparquet verliert beim Lesen
+    pyarrow-geschriebener tz-aware Indexspalten die Zeitzone.
 
     Parameters
     ----------
     path : str | Path
         Dateipfad der zu ladenden Parquet-Datei.
+    columns : list[str] | None
+        Projektion: nur diese Spalten dekodieren (``None`` = alle).
+    filters : list | None
+        Prädikate im ``read_parquet``-Format, z. B. ``[("date", ">=", ts)]``;
+        Row Groups außerhalb der Footer-Statistiken werden übersprungen.
 
     Returns
     -------
@@ -63,12 +190,12 @@ def load_parquet(path: Union[str, Path]) -> pd.DataFrame:
     p = Path(path)  # Pfadobjekt erzeugen
     if not p.is_file():  # Existenzcheck
         raise FileNotFoundError(f"Parquet-Datei nicht gefunden: {p}")
-    try:  # bevorzugte Engine fastparquet
-        return pd.read_parquet(p, engine="fastparquet")
-    except Exception as e_fast:  # Fallback auf pyarrow
+    try:  # bevorzugte Engine pyarrow
+        return pd.read_parquet(p, engine="pyarrow", columns=columns, filters=filters)
+    except Exception as e_arrow:  # Fallback auf fastparquet
         try:
-            return pd.read_parquet(p, engine="pyarrow")
-        except Exception as e_arrow:  # beide fehlgeschlagen
+            return pd.read_parquet(p, engine="fastparquet", columns=columns, filters=filters)
+        except Exception as e_fast:  # beide fehlgeschlagen
             raise RuntimeError(
                 f"Parquet laden fehlgeschlagen. "
                 f"fastparquet: {e_fast}, pyarrow: {e_arrow}"
@@ -1,15 +1,20 @@
 # src/utils/paths.py
 from __future__ import annotations
+import copy
+from functools import lru_cache
 from pathlib import Path
 import yaml
 from typing import Dict, List
 
+# libyaml-Loader (C) falls vorhanden, sonst reiner Python-SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 # Projektbasis & Config-Datei
 BASE_DIR = Path(__file__).resolve().parents[2]
 CONFIG_FILE = BASE_DIR / "config" / "data_spec.yml"
 
 with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-    SPEC: dict = yaml.safe_load(f) or {}
+    SPEC: dict = yaml.load(f, Loader=_YAML_LOADER) or {}
 
 # Pfade aus Config (mit Fallbacks)
 _paths = SPEC.get("paths", {}) or {}
@@ -24,6 +29,7 @@ INTERIM_PANEL = (BASE_DIR / _paths.get("interim_panel", INTERIM_DIR / "panel.par
 CLEAN_PANEL   = (BASE_DIR / _paths.get("clean_panel",   CLEAN_DIR / "features_v1.parquet")).resolve()
 RISKFREE_FILE = (BASE_DIR / _paths.get("riskfree",      CLEAN_DIR / "riskfree.parquet")).resolve()
 MANIFEST_FILE = (BASE_DIR / _paths.get("manifest_clean", CLEAN_DIR / "_manifest.json")).resolve()
+CACHE_DIR     = (BASE_DIR / _paths.get("cache_dir", ".cache")).resolve()  # wird erst bei Bedarf angelegt
 
 def raw_asset_path(asset: str) -> Path:
     file_rel = (SPEC.get("assets") or {}).get("file", "assets.yml")
@@ -41,11 +47,25 @@ def _normalize_asset(asset: str) -> str:
 
 # ---- Assets (immer gruppiert) ----------------------------------------------
 
+def load_yaml(path: str | Path):
+    """YAML-Datei lesen; memoisiert über ``(Pfad, mtime_ns, Größe)``.
+
+    Wiederholte Aufrufe (z. B. Notebook-Re-Runs) parsen unveränderte Dateien
+    nicht erneut; die Rückgabe ist eine tiefe Kopie und darf verändert werden.
+    """
+    p = Path(path).resolve()
+    st = p.stat()  # Änderungszeit und Größe erkennen editierte Dateien
+    return copy.deepcopy(_load_yaml_cached(str(p), st.st_mtime_ns, st.st_size))  # Kopie schützt den Cache
+
+@lru_cache(maxsize=16)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int):
+    """Eigentliches Parsen; Schlüsselargumente nur für den Cache."""
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
 def _load_assets_file(path_rel: str) -> Dict[str, List[str]]:
     """Liest eine gruppierte Asset-Datei (z. B. equities, crypto, etfs, fx)."""
-    file_path = (BASE_DIR / path_rel).resolve()
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    data = load_yaml(BASE_DIR / path_rel) or {}
     groups = {k: v for k, v in data.items() if isinstance(v, list)}
     return groups
 
@@ -13,7 +13,8 @@ Bei Fehlern wird eine ValueError mit einer klaren Meldung ausgelöst.
 from pathlib import Path
 from typing import Iterable
 import argparse
-import yaml
+
+from src.utils.paths import load_yaml  # memoisiertes YAML-Lesen (libyaml, falls vorhanden)
 
 
 def _is_str_list(value: object) -> bool:
@@ -73,8 +74,7 @@ def validate_all(cfg: dict, spec: dict) -> None:
 
 
 def _load_yaml(path: str | Path) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    return load_yaml(path) or {}
 
 
 def main(argv: Iterable[str] | None = None) -> None:
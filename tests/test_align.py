@@ -39,3 +39,23 @@ def test_align_basic():
     out2 = resample_crypto_last(crypto, cal)
     # Index der aggregierten Serie muss ebenfalls dem Kalender entsprechen
     assert out2.index.equals(cal)
+
+def test_align_naive_index_keeps_input():
+    """Tz-naive Eingabe wird als UTC gelesen, ohne den Input zu verändern."""
+    cal = nyse_trading_days(start="2024-01-01", end="2024-01-15")
+    etf = pd.DataFrame({"close": [100.0, 101.0]},
+                       index=pd.to_datetime(["2024-01-02", "2024-01-05"]))  # tz-naiv
+    out = align_to_trading_days(etf, cal)
+    # Werte landen auf den passenden Handelstagen, Input behält seinen Index
+    assert out.loc["2024-01-05", "close"] == 101.0
+    assert etf.index.tz is None
+
+def test_resample_crypto_intraday_last():
+    """Intraday-Krypto: letzte Beobachtung je Tag, ohne volles Tagesgitter."""
+    cal = nyse_trading_days(start="2024-01-01", end="2024-01-15")
+    idx = pd.date_range("2024-01-02", "2024-01-10", freq="6h", tz="UTC")
+    crypto = pd.DataFrame({"close": range(len(idx))}, index=idx)
+    out = resample_crypto_last(crypto, cal)
+    # Referenz: bisherige Tagesaggregation über ``resample``
+    expected = crypto.resample("1D").last().reindex(cal)
+    pd.testing.assert_frame_equal(out, expected, check_freq=False)
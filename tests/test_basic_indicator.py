@@ -0,0 +1,102 @@
+"""
+Tests für die Basisindikatoren: JIT-Kernel (numba) und pandas-Fallback der
+Corwin–Schultz-/Becker–Parkinson-Schätzer müssen identische Werte liefern.
+"""
+
+# NumPy/pandas für synthetische Hoch/Tief-Reihen
+import numpy as np
+import pandas as pd
+import pytest
+
+# zu testendes Modul und Kernel-Schalter
+import src.features.basic_indicator as bi
+from src.features import _numba_loops as nl
+
+
+def _high_low(n: int = 60):
+    """Breite High/Low-Matrizen für zwei Assets, inkl. einer Lücke."""
+    rng = np.random.default_rng(1)  # reproduzierbar
+    idx = pd.bdate_range("2022-01-03", periods=n)
+    mid = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n, 2)), axis=0)), index=idx, columns=["A", "B"])
+    high = mid * np.exp(np.abs(rng.normal(0, 0.005, (n, 2))))
+    low = mid * np.exp(-np.abs(rng.normal(0, 0.005, (n, 2))))
+    high.iloc[10, 0] = np.nan  # fehlender Handelstag
+    return high, low
+
+
+def _all_estimators(high, low, sample_length):
+    """Alle Schätzer einmal auswerten (Reihenfolge wie in build_clean)."""
+    beta = bi.corwin_schultz_beta(high, low, sample_length=sample_length)
+    gamma = bi.corwin_schultz_gamma(high, low)
+    alpha = bi.corwin_schultz_alpha(beta, gamma)
+    return [beta, gamma, alpha, bi.corwin_schultz_spread(alpha), bi.becker_parkinson_sigma(beta, gamma)]
+
+
+@pytest.mark.skipif(not nl.HAVE_NUMBA, reason="numba nicht installiert")
+@pytest.mark.parametrize("sample_length", [1, 3])
+def test_numba_matches_pandas(monkeypatch, sample_length):
+    """Kernel-Pfad == pandas-Pfad (Werte, NaN-Positionen, Index)."""
+    high, low = _high_low()
+    low.iloc[20, 1] = 0.0  # Nulltief: inf/NaN wie pandas statt ZeroDivisionError
+    jit = _all_estimators(high, low, sample_length)
+    monkeypatch.setattr(nl, "HAVE_NUMBA", False)  # pandas-Fallback erzwingen
+    ref = _all_estimators(high, low, sample_length)
+    for a, b in zip(jit, ref):
+        assert a.index.equals(b.index) and list(a.columns) == list(b.columns)
+        np.testing.assert_allclose(a.to_numpy(), b.to_numpy(), rtol=1e-10, atol=1e-14, equal_nan=True)
+
+
+@pytest.mark.skipif(not nl.HAVE_NUMBA, reason="numba nicht installiert")
+def test_numba_aligns_labels_like_pandas(monkeypatch):
+    """Abweichende Zeilen-/Spaltenreihenfolge liefert dieselben Werte wie pandas."""
+    high, low = _high_low()
+    pairs = [(high["A"], low["A"].iloc[::-1]), (high, low[["B", "A"]])]  # umgedrehter Index, getauschte Spalten
+    jit = [bi.corwin_schultz_gamma(h, lo) for h, lo in pairs] + [bi.corwin_schultz_bundle(*pairs[1])["sigma"]]
+    monkeypatch.setattr(nl, "HAVE_NUMBA", False)  # pandas-Fallback erzwingen
+    ref = [bi.corwin_schultz_gamma(h, lo) for h, lo in pairs] + [bi.corwin_schultz_bundle(*pairs[1])["sigma"]]
+    for a, b in zip(jit, ref):
+        assert a.index.equals(b.index)
+        np.testing.assert_allclose(a.to_numpy(), b.to_numpy(), rtol=1e-10, atol=1e-14, equal_nan=True)
+
+
+@pytest.mark.skipif(not nl.HAVE_NUMBA, reason="numba nicht installiert")
+@pytest.mark.parametrize("sample_length", [1, 3])
+def test_fused_cs_kernel_matches_estimators(sample_length):
+    """Fusionierter Kernel schreibt dieselben Sigma/Spread-Werte (float32-Ziel)."""
+    high, low = _high_low()
+    *_, spread, sigma = _all_estimators(high, low, sample_length)
+    out = np.empty((len(high), 2, 2), dtype=np.float32)  # (Zeit, Asset, Slot) wie der CLEAN-Puffer
+    nl._cs_block(high.to_numpy(), low.to_numpy(), sample_length, out[:, :, 0], out[:, :, 1], nl.NO_OUT, nl.NO_OUT, nl.NO_OUT)
+    np.testing.assert_array_equal(out[:, :, 0], sigma.to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(out[:, :, 1], spread.to_numpy(dtype=np.float32))
+
+
+def test_log_returns_match_ratio_form():
+    """Log-Differenz == ``ln(P_t / P_{t-1})`` inkl. Lücken, Nullkurs und breiter Eingabe."""
+    close = pd.Series([100.0, 101.0, np.nan, 99.0, 0.0, 98.0], name="SPY")
+    got = bi.returns(close, kind="log")
+    with np.errstate(divide="ignore"):
+        ref = np.log(close / close.shift(1))
+    pd.testing.assert_series_equal(got, ref)
+    wide = bi.returns(pd.DataFrame({"A": close, "B": close * 2}), kind="log")
+    np.testing.assert_allclose(wide["B"].to_numpy(), ref.to_numpy(), equal_nan=True)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_bundle_matches_single_estimators(monkeypatch, use_numba):
+    """``corwin_schultz_bundle`` liefert exakt die Werte der Einzelfunktionen."""
+    if use_numba and not nl.HAVE_NUMBA:
+        pytest.skip("numba nicht installiert")
+    monkeypatch.setattr(nl, "HAVE_NUMBA", use_numba)
+    high, low = _high_low()
+    ref = dict(zip(["beta", "gamma", "alpha", "spread", "sigma"], _all_estimators(high, low, 2)))
+    got = bi.corwin_schultz_bundle(high, low, sample_length=2)
+    for key, frame in ref.items():
+        pd.testing.assert_frame_equal(got[key], frame)
+
+
+def test_spread_accurate_for_small_alpha():
+    """Spread ``2 tanh(a/2)`` ohne Auslöschung bei kleinem Alpha (Referenz über ``expm1``)."""
+    alpha = pd.Series([0.0, 1e-9, 1e-4, 0.02, 0.5])
+    e = np.expm1(alpha.to_numpy())
+    np.testing.assert_allclose(bi.corwin_schultz_spread(alpha).to_numpy(), 2 * e / (2 + e), rtol=1e-15)
@@ -0,0 +1,136 @@
+"""
+Tests für den CLEAN-Build: die breite (Datum × Asset) Feature-Berechnung muss
+dieselben Werte liefern wie die Indikatoren auf einzelnen Asset-Serien.
+"""
+
+# NumPy/pandas für synthetische Preisdaten und Vergleiche
+import numpy as np
+import pandas as pd
+import pytest
+
+# zu testende Funktion sowie Referenz-Indikatoren auf Serienebene
+from src.data.build_clean import build_clean_data
+from src.utils.parquet_io import load_parquet
+from src.features import _numba_loops as nl
+from src.features.basic_indicator import returns
+from src.features.technical_indicators import (
+    relative_strength_index,
+    commodity_channel_index,
+    average_directional_index,
+    moving_average_convergence_divergence,
+)
+
+
+def _synthetic_panel(n_days: int = 120, assets=("SPY", "BTCUSD")) -> pd.DataFrame:
+    """Kleines rechteckiges Panel ``(date, asset)`` mit plausiblen OHLCV-Daten."""
+    rng = np.random.default_rng(0)  # reproduzierbarer Zufall
+    dates = pd.bdate_range("2021-01-01", periods=n_days, name="date")  # Werktage
+    frames = []
+    for a in assets:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_days)))  # Random Walk
+        open_ = close * np.exp(rng.normal(0, 0.003, n_days))
+        high = np.maximum(open_, close) * 1.004  # Hoch über Open/Close
+        low = np.minimum(open_, close) * 0.996  # Tief unter Open/Close
+        df = pd.DataFrame(
+            {"open": open_, "high": high, "low": low, "close": close, "adj_close": close,
+             "volume": rng.integers(1_000, 10_000, n_days).astype(float),
+             "dividends": 0.0, "stock_splits": 1.0},
+            index=dates,
+        )
+        df["asset"] = a
+        frames.append(df)
+    return pd.concat(frames).set_index("asset", append=True).sort_index()
+
+
+def test_wide_features_match_per_asset():
+    """Breite Berechnung == Berechnung je Asset-Serie (inkl. CASH-Zeilen)."""
+    prices = _synthetic_panel()
+    dates = prices.index.get_level_values("date").unique()
+    rf = pd.Series(0.02, index=dates)  # konstanter Jahreszins
+    out = build_clean_data(prices, rf)
+
+    # Index: alle Input-Zeilen plus CASH je Tag, eindeutig und sortiert
+    assert out.index.is_unique and out.index.is_monotonic_increasing
+    assert len(out) == len(prices) + len(dates)
+
+    px = prices.xs("SPY", level="asset")  # Referenz: einzelnes Asset
+    got = out.xs("SPY", level="asset")
+    adx = average_directional_index(px["high"], px["low"], px["close"], 14)
+    macd_line, macd_signal, macd_hist = moving_average_convergence_divergence(px["close"], 12, 26, 9)
+    expected = {
+        "daily_return_log": returns(px["close"], kind="log"),
+        "relative_strength_index_14": relative_strength_index(px["close"], 14),
+        "commodity_channel_index_20": commodity_channel_index(px["high"], px["low"], px["close"], 20),
+        "average_directional_index_14": adx["adx_14"],
+        "macd_line_12_26_9": macd_line,
+        "macd_signal_12_26_9": macd_signal,
+        "macd_histogram_12_26_9": macd_hist,
+        "execution_price_t_plus_1_open": px["open"].shift(-1),
+    }
+    for col, ref in expected.items():  # float32-Speicherung → relative Toleranz
+        np.testing.assert_allclose(got[col].to_numpy(float), ref.to_numpy(float), rtol=1e-5, equal_nan=True)
+
+
+def test_parallel_blocks_match_single_thread():
+    """Threads über Asset-Blöcke ändern das Ergebnis nicht."""
+    prices = _synthetic_panel(assets=("AAA", "BBB", "CCC"))
+    rf = pd.Series(0.01, index=prices.index.get_level_values("date").unique())
+    single = build_clean_data(prices, rf, n_jobs=1)
+    multi = build_clean_data(prices, rf, n_jobs=2)  # zwei ungleich große Blöcke
+    pd.testing.assert_frame_equal(single, multi)
+
+
+def test_out_path_roundtrip(tmp_path):
+    """Gestreamt geschriebenes CLEAN-Parquet liest sich unverändert zurück."""
+    prices = _synthetic_panel(n_days=400)  # über Jahresgrenzen → mehrere Row Groups
+    rf = pd.Series(0.02, index=prices.index.get_level_values("date").unique())
+    target = tmp_path / "clean.parquet"
+    out = build_clean_data(prices, rf, out_path=str(target))
+    pd.testing.assert_frame_equal(load_parquet(target), out)
+
+
+@pytest.mark.skipif(not nl.HAVE_NUMBA, reason="numba nicht installiert")
+def test_numba_ta_block_matches_pandas(monkeypatch):
+    """Spezialisierte TA-/ADV-Kernel == pandas-Indikatoren, auch mit Lücken."""
+    prices = _synthetic_panel(assets=("AAA", "BBB"))
+    prices.iloc[[7, 40, 41], prices.columns.get_loc("close")] = np.nan  # fehlende Schlusskurse
+    prices.iloc[[15], prices.columns.get_loc("high")] = np.nan  # fehlendes Hoch
+    prices.iloc[[25], prices.columns.get_loc("volume")] = np.nan  # fehlendes Volumen (ADV-Kernel)
+    prices.iloc[[30], prices.columns.get_loc("low")] = 0.0  # Nulltief: inf/NaN statt ZeroDivisionError
+    rf = pd.Series(0.01, index=prices.index.get_level_values("date").unique())
+    jit = build_clean_data(prices, rf)
+    monkeypatch.setattr(nl, "HAVE_NUMBA", False)  # pandas-Pfad erzwingen
+    ref = build_clean_data(prices, rf)
+    pd.testing.assert_frame_equal(jit, ref, rtol=1e-5, atol=1e-6)
+
+
+def test_cci_vectorized_mad_matches_rolling_apply():
+    """CCI mit vektorisierter MAD entspricht der ``rolling.apply``-Referenz (inkl. NaN-Lücke)."""
+    panel = _synthetic_panel(n_days=80).xs("SPY", level="asset")
+    high, low, close = panel["high"].copy(), panel["low"], panel["close"]
+    high.iloc[30] = np.nan  # Lücke: betroffene Fenster werden NaN
+    tp = (high + low + close) / 3.0
+    mad = tp.rolling(20, min_periods=20).apply(lambda x: np.mean(np.abs(x - x.mean())), raw=False)
+    expected = (tp - tp.rolling(20, min_periods=20).mean()) / (0.015 * mad.replace(0, np.nan))
+    got = commodity_channel_index(high, low, close, 20)
+    pd.testing.assert_series_equal(got, expected, check_names=False, rtol=1e-10)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_ragged_panel_matches_per_asset(monkeypatch, use_numba):
+    """Lückenhaftes Panel: Features je Asset auf dessen eigenen Zeilen (wie Einzel-Build)."""
+    if use_numba and not nl.HAVE_NUMBA:
+        pytest.skip("numba nicht installiert")
+    monkeypatch.setattr(nl, "HAVE_NUMBA", use_numba)
+    prices = _synthetic_panel(assets=("AAA", "BBB", "CCC"))
+    dates = prices.index.get_level_values("date").unique()
+    asset = prices.index.get_level_values("asset")
+    gaps = (asset == "BBB") & np.isin(prices.index.get_level_values("date"), dates[1::2])  # BBB nur jeden zweiten Tag
+    ragged = prices[~gaps]
+    rf = pd.Series(0.01, index=dates)
+    out = build_clean_data(ragged, rf, n_jobs=2)
+    assert len(out) == len(ragged) + len(dates)
+    for a in ("AAA", "BBB", "CCC"):
+        own = ragged.xs(a, level="asset", drop_level=False)
+        ref = build_clean_data(own, rf.reindex(own.index.get_level_values("date")), n_jobs=1)
+        pd.testing.assert_frame_equal(out.xs(a, level="asset"), ref.xs(a, level="asset"), check_freq=False)
@@ -0,0 +1,120 @@
+"""
+Tests für den INTERIM-Build: synthetische RAW-Parquets (Tiingo-Schema) werden
+normalisiert, auf NYSE-Handelstage ausgerichtet und zu einem Panel gestapelt.
+"""
+
+# Logging-Handler für die Duplikat-Warnung, NumPy/pandas für synthetische RAW-Dateien
+import logging
+import numpy as np
+import pandas as pd
+
+# zu testendes Modul (RAW-Pfad wird auf tmp_path umgebogen)
+import src.data.build_interim as bi
+
+
+def _write_raw(tmp_path, monkeypatch, assets=("SPY", "BTCUSD")):
+    """RAW-Dateien im Tiingo-Format schreiben und Pfad-Helper umleiten."""
+    rng = np.random.default_rng(0)  # reproduzierbar
+    for a in assets:
+        crypto = a.endswith("USD")
+        days = pd.date_range("2023-12-28", "2024-02-05", freq="D" if crypto else "B", tz="UTC")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+        raw = pd.DataFrame({
+            "date": days.strftime("%Y-%m-%dT%H:%M:%S.000Z"),  # ISO-Strings wie in der API-Antwort
+            "open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+            "volume": rng.integers(100, 1_000, len(days)).astype(float),
+        })
+        if not crypto:  # Aktien: Provider-Spalten, die INTERIM umbenennt
+            raw["adjClose"] = close
+            raw["divCash"] = 0.0
+            raw["splitFactor"] = 1.0
+        raw.to_parquet(tmp_path / f"{a}.parquet")
+    monkeypatch.setattr(bi, "raw_asset_path", lambda asset: tmp_path / f"{asset}.parquet")
+
+
+def test_interim_panel_structure(tmp_path, monkeypatch):
+    """Panel hat (date, asset)-Index auf Handelstagen und kanonische Spalten."""
+    _write_raw(tmp_path, monkeypatch)
+    out = bi.build_interim_prices(["SPY", "BTCUSD"], "2024-01-01", "2024-01-31", save=False)
+    assert list(out.index.names) == ["date", "asset"]
+    assert out.index.is_unique and out.index.is_monotonic_increasing
+    assert list(out.columns) == bi.DEFAULT_SPEC["fields"]
+    assert out["stock_splits"].dtype == np.float32 and out["close"].dtype == np.float64  # kompakte Nebenfelder
+    assert out["volume"].dtype == np.float64 and out["dividends"].dtype == np.float64  # verlustfrei
+    # beide Assets auf denselben Handelstagen (Krypto-Wochenenden entfallen)
+    spy = out.xs("SPY", level="asset").index
+    btc = out.xs("BTCUSD", level="asset").index
+    assert spy.equals(btc) and spy.dayofweek.max() < 5
+
+
+def test_parallel_load_matches_serial(tmp_path, monkeypatch):
+    """Threads über RAW-Dateien ändern das Panel nicht."""
+    _write_raw(tmp_path, monkeypatch, assets=("SPY", "QQQ", "BTCUSD"))
+    args = (["SPY", "QQQ", "BTCUSD"], "2024-01-01", "2024-01-31")
+    serial = bi.build_interim_prices(*args, save=False, n_jobs=1)
+    threaded = bi.build_interim_prices(*args, save=False, n_jobs=3)
+    pd.testing.assert_frame_equal(serial, threaded)
+
+
+def test_footer_types_cached_per_file_state(tmp_path):
+    """Footer-Typen werden je Dateistand einmal gelesen und nach Umschreiben erneuert."""
+    from src.utils import parquet_io
+    path = tmp_path / "x.parquet"
+    pd.DataFrame({"date": ["2024-01-02"], "close": [1.0]}).to_parquet(path)
+    parquet_io._column_types_cached.cache_clear()
+    assert parquet_io.parquet_column_types(path) == {"date": "string", "close": "double"}
+    parquet_io.parquet_column_types(path)  # zweiter Aufruf → Cache-Treffer
+    assert parquet_io._column_types_cached.cache_info().hits == 1
+    pd.DataFrame({"date": pd.to_datetime(["2024-01-02"]), "close": [1.0], "volume": [5.0]}).to_parquet(path)
+    assert set(parquet_io.parquet_column_types(path)) == {"date", "close", "volume"}
+
+
+def test_timestamp_dates_match_string_dates(tmp_path, monkeypatch):
+    """Als Timestamp gespeicherte Daten ergeben dasselbe Panel wie ISO-Strings."""
+    _write_raw(tmp_path, monkeypatch, assets=("SPY",))
+    args = (["SPY"], "2024-01-01", "2024-01-31")
+    from_strings = bi.build_interim_prices(*args, save=False)
+    raw = pd.read_parquet(tmp_path / "SPY.parquet")
+    raw["date"] = pd.to_datetime(raw["date"], utc=True)  # tz-aware Timestamp-Spalte
+    raw.to_parquet(tmp_path / "SPY.parquet")
+    pd.testing.assert_frame_equal(bi.build_interim_prices(*args, save=False), from_strings)
+
+
+def test_duplicate_raw_dates_keep_last(tmp_path, monkeypatch):
+    """Doppelt gelieferte RAW-Tage: die zuletzt gelieferte Zeile gewinnt, mit Warnung."""
+    _write_raw(tmp_path, monkeypatch, assets=("SPY",))
+    args = (["SPY"], "2024-01-01", "2024-01-31")
+    raw = pd.read_parquet(tmp_path / "SPY.parquet")
+    fixed = raw.copy()
+    fixed.loc[fixed["date"].str.startswith("2024-01-10"), "close"] = -1.0  # Korrekturwert
+    dup = pd.concat([raw, fixed[fixed["date"].str.startswith("2024-01-10")]], ignore_index=True)
+    dup.to_parquet(tmp_path / "SPY.parquet")
+    warned = []
+    seen = logging.Handler()  # sammelt Warnungen des Projekt-Loggers (propagiert nicht)
+    seen.emit = lambda record: warned.append(record.getMessage())
+    monkeypatch.setattr(bi._LOG, "handlers", [seen])
+    out = bi.build_interim_prices(*args, save=False)
+    assert len(warned) == 1 and warned[0].startswith("[SPY] 1 duplicate RAW dates dropped")
+    fixed.to_parquet(tmp_path / "SPY.parquet")
+    pd.testing.assert_frame_equal(out, bi.build_interim_prices(*args, save=False))
+    assert len(warned) == 1  # bereinigte Datei: keine weitere Warnung
+
+
+def test_large_volume_kept_exact(tmp_path, monkeypatch):
+    """Volumina über 2^24 (ETF-Größenordnung) und Dividenden bleiben exakt."""
+    _write_raw(tmp_path, monkeypatch, assets=("SPY",))
+    raw = pd.read_parquet(tmp_path / "SPY.parquet")
+    raw["volume"] = 80_000_001.0  # float32 würde auf ein Vielfaches von 8 runden
+    raw["divCash"] = 0.1234
+    raw.to_parquet(tmp_path / "SPY.parquet")
+    out = bi.build_interim_prices(["SPY"], "2024-01-01", "2024-01-31", save=False)
+    assert (out["volume"] == 80_000_001.0).all() and (out["dividends"] == 0.1234).all()
+
+
+def test_save_load_parquet_keeps_tz_panel(tmp_path, monkeypatch):
+    """pyarrow-Schreibpfad: (date, asset)-Panel samt UTC-Zeitzone bleibt beim Laden erhalten."""
+    from src.utils.parquet_io import save_parquet, load_parquet
+    _write_raw(tmp_path, monkeypatch)
+    out = bi.build_interim_prices(["SPY", "BTCUSD"], "2024-01-01", "2024-01-31", save=False)
+    save_parquet(out, tmp_path / "panel.parquet")
+    pd.testing.assert_frame_equal(load_parquet(tmp_path / "panel.parquet"), out, check_freq=False)
@@ -20,3 +20,33 @@ def test_nyse_trading_days_basic():
     assert all(ts.weekday() < 5 for ts in idx)  # jeder Eintrag repräsentiert einen Werktag (Mo-Fr)
     # 4) Kein leerer Index
     assert len(idx) > 0  # Kalender darf nicht leer sein
+
+def test_nyse_trading_days_cached():
+    """Wiederholte Aufrufe nutzen den Cache, liefern aber eigene Index-Objekte."""
+    import src.data.calendar as cal
+    a = nyse_trading_days(start="2023-01-01", end="2023-12-31")
+    hits = cal._nyse_trading_days_cached.cache_info().hits
+    a.name = "date"  # Änderung am Ergebnis darf den Cache nicht verändern
+    b = nyse_trading_days(start="2023-01-01", end="2023-12-31")
+    assert cal._nyse_trading_days_cached.cache_info().hits == hits + 1  # zweiter Aufruf ohne neue Kalenderberechnung
+    assert a is not b and a.equals(b) and b.name is None
+    assert pd.Timestamp("2023-07-04", tz="UTC") not in a  # Feiertag bleibt ausgeschlossen
+
+def test_report_gaps_matches_difference():
+    """Lückenbericht entspricht der Pandas-Differenzmenge, auch bei doppeltem Index."""
+    from src.data.checks import report_gaps
+    sessions = nyse_trading_days(start="2024-01-01", end="2024-03-31")
+    index = sessions.delete([0, 5, 6]).append(sessions[10:20])  # Lücken + Panel-Duplikate
+    assert report_gaps(index, sessions) == list(sessions.difference(index))
+    assert report_gaps(index, sessions) == [sessions[0], sessions[5], sessions[6]]
+
+def test_fallback_business_days(monkeypatch):
+    """Ohne Kalenderbibliothek: Mo–Fr inkl. Endtag, wie ``pd.date_range(freq="B")``."""
+    import src.data.calendar as cal
+    monkeypatch.setattr(cal, "_CAL_LIB", None)
+    cal._nyse_trading_days_cached.cache_clear()  # keine Treffer aus dem Bibliothekspfad
+    idx = cal.nyse_trading_days(start="2023-12-20", end="2024-02-05")
+    idx.freq = "B"  # Werktage sind B-konform; darf nicht im Cache landen
+    assert cal.nyse_trading_days(start="2023-12-20", end="2024-02-05").freq is None
+    cal._nyse_trading_days_cached.cache_clear()  # Fallback-Ergebnis nicht an andere Tests weitergeben
+    pd.testing.assert_index_equal(idx, pd.date_range("2023-12-20", "2024-02-05", freq="B", tz="UTC"), exact=False)
@@ -49,3 +49,39 @@ def test_fees():
     # fees = 1001 * 0.0005 = 0.5005
     assert abs(out.loc[idx[0], "fees"] - 0.5005) < 1e-8  # korrekte Kommissionskosten
     assert abs(out.loc[idx[0], "total_cost"] - (1.0 + 0.5005)) < 1e-8  # Spread + Fees = total_cost
+
+def test_round_shares_towards_zero():
+    """Käufe abrunden, Verkäufe aufrunden (Richtung 0), NaN → 0, Lotgröße beachten."""
+    import numpy as np
+    from portfolio.execution import round_shares
+    q = pd.Series([10.7, -10.7, 0.4, -0.4, np.nan, 0.0, 250.0, -250.0])
+    out = round_shares(q)
+    assert out.tolist() == [10.0, -10.0, 0.0, 0.0, 0.0, 0.0, 250.0, -250.0]
+    assert not np.signbit(out.to_numpy()[[3, 4, 5]]).any()  # keine -0.0
+    assert round_shares(q, lot=100).tolist() == [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 200.0, -200.0]
+    assert round_shares(pd.Series([3, -3], dtype="Int64"), lot=2).tolist() == [2.0, -2.0]
+
+def test_execution_without_spread_column():
+    """Fehlt ``spread_cs``, wird ohne Spread ausgeführt (keine Exception)."""
+    idx = pd.MultiIndex.from_product(
+        [pd.to_datetime(["2020-01-01", "2020-01-02"]), ["SPY"]], names=["date", "asset"]
+    )
+    prices = pd.DataFrame({"exec_ref_tplus1": [100.0, 101.0]}, index=idx)
+    orders = pd.DataFrame({"delta_shares": [-5.5, None]}, index=idx)
+    trades = apply_execution(prices, orders)
+    assert trades["q"].tolist() == [-5.0, 0.0]
+    assert trades["p_exec"].tolist() == [100.0, 101.0] and trades["spread_cost"].sum() == 0.0
+
+def test_fees_zero_config_matches_general_path():
+    """Ohne Kommission/Slippage: Kurzschluss liefert dieselben Kosten wie die volle Rechnung."""
+    idx = pd.MultiIndex.from_product(
+        [pd.to_datetime(["2020-01-01", "2020-01-02"]), ["SPY", "QQQ"]], names=["date", "asset"]
+    )
+    trades = pd.DataFrame({
+        "q": [10.0, -3.0, 0.0, 5.0], "p_ref": [100.0, 50.0, 101.0, 51.0], "p_exec": [100.1, 49.9, 101.0, 51.1],
+        "notional_abs": [1001.0, 149.7, 0.0, 255.5], "spread_cost": [1.0, 0.15, 0.0, 0.25],
+    }, index=idx)
+    fast = apply_fees(trades)
+    full = apply_fees(trades, commission_bps=1e-300)  # erzwingt den allgemeinen Pfad, Gebühren ≈ 0
+    pd.testing.assert_frame_equal(fast, full)
+    assert "fees" not in trades.columns  # Eingabe bleibt unverändert
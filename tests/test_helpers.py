@@ -39,3 +39,63 @@ def test_logger_basic(tmp_path):
     # File wurde beschrieben:
     s = log_file.read_text(encoding="utf-8")  # Dateiinhalt lesen
     assert "hello" in s  # Logzeile muss enthalten sein
+
+def test_file_summary_memoized(tmp_path):
+    """Manifest-Summary wird je Dateistand nur einmal berechnet."""
+    import pandas as pd  # kleines Parquet als Testdatei
+    from src.utils import manifest
+    path = str(tmp_path / "x.parquet")
+    pd.DataFrame({"a": [1.0, 2.0]}).to_parquet(path)
+    manifest._file_summary_cached.cache_clear()  # definierter Startzustand
+    first = manifest.file_summary(path)
+    first["n_rows"] = -1  # Änderung an der Rückgabe darf den Cache nicht verändern
+    second = manifest.file_summary(path)
+    assert second["n_rows"] == 2 and manifest._file_summary_cached.cache_info().hits == 1
+    # geänderte Datei → neuer Schlüssel, neue Prüfsumme
+    pd.DataFrame({"a": [1.0, 2.0, 3.0]}).to_parquet(path)
+    third = manifest.file_summary(path)
+    assert third["n_rows"] == 3 and third["sha256"] != second["sha256"]
+
+def test_file_summary_date_scope_from_index(tmp_path):
+    """Datumsbereich kommt aus der ``date``-Indexebene bzw. -Spalte."""
+    import pandas as pd
+    from src.utils import manifest
+    idx = pd.MultiIndex.from_product(
+        [pd.date_range("2024-01-02", periods=3, tz="UTC"), ["SPY", "QQQ"]], names=["date", "asset"])
+    panel = pd.DataFrame({"close": np.arange(6.0)}, index=idx)
+    panel.to_parquet(tmp_path / "panel.parquet")
+    panel.reset_index().to_parquet(tmp_path / "flat.parquet")
+    for name in ("panel.parquet", "flat.parquet"):
+        out = manifest.file_summary(str(tmp_path / name))
+        assert (out["date_min"], out["date_max"]) == ("2024-01-02", "2024-01-04")
+
+def test_assert_non_negative_reports_first_row():
+    """NaN wird ignoriert; gemeldet wird die erste Zeile mit negativem Wert."""
+    import pandas as pd
+    import pytest
+    from src.data.checks import assert_non_negative
+    df = pd.DataFrame({"a": [1.0, np.nan, 2.0, -1.0], "b": [0, 1, -3, 4]},
+                      index=pd.date_range("2024-01-01", periods=4))
+    assert_non_negative(df.iloc[:2])  # NaN allein ist kein Verstoß
+    with pytest.raises(AssertionError, match="2024-01-03"):
+        assert_non_negative(df)
+    with pytest.raises(AssertionError, match="2024-01-04"):
+        assert_non_negative(df, cols="a")
+    # Text- und unsigned-Spalten werden übersprungen, Extension-Ints mit NA geprüft
+    tags = pd.DataFrame({"asset": ["SPY", "QQQ"], "volume": np.array([1, 2], dtype=np.uint64)})
+    assert_non_negative(tags)
+    with pytest.raises(AssertionError):
+        assert_non_negative(pd.DataFrame({"q": pd.array([1, None, -2], dtype="Int64")}))
+
+def test_load_yaml_memoized(tmp_path):
+    """YAML wird je Dateistand einmal geparst; Rückgaben sind unabhängige Kopien."""
+    from src.utils import paths
+    cfg = tmp_path / "assets.yml"
+    cfg.write_text("equities: [SPY, QQQ]\n", encoding="utf-8")
+    paths._load_yaml_cached.cache_clear()
+    first = paths.load_yaml(cfg)
+    first["equities"].append("XXX")  # Änderung darf den Cache nicht verändern
+    assert paths.load_yaml(cfg) == {"equities": ["SPY", "QQQ"]}
+    assert paths._load_yaml_cached.cache_info().hits == 1
+    cfg.write_text("equities: [SPY, QQQ, IWM]\n", encoding="utf-8")  # geänderte Größe → neuer Schlüssel
+    assert paths.load_yaml(cfg)["equities"] == ["SPY", "QQQ", "IWM"]
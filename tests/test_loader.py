@@ -112,3 +112,138 @@ def test_parquet_persistence_roundtrip(tmp_path: Path):
     assert df.shape == df2.shape  # Shape unverändert
     assert list(df.columns) == list(df2.columns)  # Spalten identisch
 
+
+def test_download_threaded_keeps_order(tmp_path, monkeypatch):
+    """Parallele Downloads: Ausgabe in Eingabereihenfolge, Fehler werden übersprungen."""
+    import time
+    import pandas as pd
+    import src.data.load_raw as lr
+
+    def fake_load(asset, start, end, token=None, as_table=False, cache_ttl=None):  # Offline-Ersatz für die API
+        if asset == "BAD":
+            raise ValueError("unknown ticker")
+        time.sleep(0.05 if asset == "SPY" else 0.0)  # erstes Asset endet zuletzt
+        return pd.DataFrame({"date": ["2024-01-02"], "close": [1.0]})
+
+    monkeypatch.setattr(lr, "_load_tiingo", fake_load)
+    monkeypatch.setattr(lr, "raw_asset_path", lambda a: tmp_path / f"{a}.parquet")
+    written = download_raw_prices(["SPY", "BAD", "QQQ"], "2024-01-01", "2024-01-05", n_jobs=3)
+    assert written == [str(tmp_path / "SPY.parquet"), str(tmp_path / "QQQ.parquet")]
+
+def test_load_tiingo_uses_session_and_auth_header():
+    """Token geht in den Authorization-Header, nicht in die URL-Parameter."""
+    from src.data.load_raw import _load_tiingo
+    calls = []
+
+    class FakeResponse:
+        content = b'[{"date": "2024-01-02T00:00:00.000Z", "close": 1.0}]'  # Rohbytes wie von ``requests``
+
+        def raise_for_status(self):
+            pass
+
+    class FakeSession:
+        def get(self, url, params=None, headers=None, timeout=None):
+            calls.append((url, params, headers))
+            return FakeResponse()
+
+    df = _load_tiingo("SPY", "2024-01-01", "2024-01-05", token="abc", session=FakeSession(), cache_dir=None)
+    url, params, headers = calls[0]
+    assert url.endswith("/daily/SPY/prices") and "token" not in params
+    assert headers["Authorization"] == "Token abc" and len(df) == 1
+
+def test_load_tiingo_disk_cache(tmp_path):
+    """Wiederholte Abrufe kommen aus dem Plattencache, bis der Eintrag abgelaufen ist (TTL konfigurierbar)."""
+    import json
+    from src.data.load_raw import _load_tiingo
+    calls = []
+    body = [{"date": "2024-01-02T00:00:00.000Z", "close": 1.0}]
+    raw = json.dumps(body).encode("utf-8")  # Rohbytes wie von ``requests``
+
+    class FakeResponse:
+        content = raw
+
+        def raise_for_status(self):
+            pass
+
+    class FakeSession:
+        def get(self, url, params=None, headers=None, timeout=None):
+            calls.append(url)
+            return FakeResponse()
+
+    import pandas as pd
+    kw = dict(token="abc", session=FakeSession(), cache_dir=tmp_path)
+    first = _load_tiingo("SPY", "2024-01-01", "2024-01-05", **kw)
+    second = _load_tiingo("SPY", "2024-01-01", "2024-01-05", **kw)
+    assert len(calls) == 1  # zweiter Aufruf ohne Netzwerk
+    pd.testing.assert_frame_equal(first, second)
+    _load_tiingo("SPY", "2024-01-01", "2024-01-08", **kw)  # anderes Fenster → eigener Eintrag
+    assert len(calls) == 2
+    import math, os, time
+    import src.data.load_raw as lr
+    old = time.time() - lr.CACHE_TTL_SEC - 1
+    for p in tmp_path.iterdir():
+        os.utime(p, (old, old))  # auch historische Fenster verfallen (adj*-Werte werden umgerechnet)
+    _load_tiingo("SPY", "2024-01-01", "2024-01-08", cache_ttl=math.inf, **kw)  # unbegrenzt → weiter aus dem Cache
+    assert len(calls) == 2
+    _load_tiingo("SPY", "2024-01-01", "2024-01-05", **kw)
+    assert len(calls) == 3
+
+def test_records_table_roundtrip_matches_frame(tmp_path):
+    """RAW über Arrow-Tabelle liest sich wie der bisherige pandas-Pfad zurück."""
+    import pandas as pd
+    from src.data.load_raw import _records_frame, _records_table
+    rows = [
+        {"date": "2024-01-02T00:00:00.000Z", "close": 1.5, "volume": 100},
+        {"date": "2024-01-03T00:00:00.000Z", "close": 2, "volume": None},  # int in Float-Spalte, fehlendes Volumen
+        {"date": "2024-01-04T00:00:00.000Z", "close": 2.5, "divCash": 0.1},  # zusätzlicher Schlüssel
+    ]
+    save_parquet(_records_frame(rows), tmp_path / "frame.parquet")
+    save_parquet(_records_table(rows), tmp_path / "table.parquet")
+    pd.testing.assert_frame_equal(load_parquet(tmp_path / "frame.parquet"), load_parquet(tmp_path / "table.parquet"))
+
+def test_crypto_tickers_share_one_request(tmp_path, monkeypatch):
+    """Alle Krypto-Paare kommen aus einem Abruf; fehlende Ticker werden übersprungen."""
+    import src.data.load_raw as lr
+    calls = []
+
+    def fake_get(session, url, params, headers, cache_dir, ttl):  # Offline-Ersatz für HTTP/Cache
+        calls.append(params["tickers"])
+        return [
+            {"ticker": "ethusd", "priceData": [{"date": "2024-01-02T00:00:00+00:00", "close": 2.0}]},
+            {"ticker": "btcusd", "priceData": [{"date": "2024-01-02T00:00:00+00:00", "close": 1.0}]},
+        ]
+
+    monkeypatch.setattr(lr, "cached_get_json", fake_get)
+    monkeypatch.setattr(lr, "raw_asset_path", lambda a: tmp_path / f"{a}.parquet")
+    written = download_raw_prices(["BTC-USD", "SOLUSD", "ETH-USD"], "2024-01-01", "2024-01-05", token="abc")
+    assert calls == ["btcusd,solusd,ethusd"]
+    assert written == [str(tmp_path / "BTC-USD.parquet"), str(tmp_path / "ETH-USD.parquet")]
+    assert load_parquet(tmp_path / "ETH-USD.parquet")["close"].tolist() == [2.0]
+
+def test_download_skips_covered_raw_file(tmp_path, monkeypatch):
+    """Deckt eine frische RAW-Datei das Fenster ab, entfällt der Abruf (außer ``force_refresh``)."""
+    import pandas as pd
+    import src.data.load_raw as lr
+    calls = []
+
+    def fake_load(asset, start, end, token=None, as_table=False, cache_ttl=None):
+        calls.append(asset)
+        return pd.DataFrame({"date": ["2024-01-02T00:00:00.000Z"], "close": [1.0]})
+
+    monkeypatch.setattr(lr, "_load_tiingo", fake_load)
+    monkeypatch.setattr(lr, "raw_asset_path", lambda a: tmp_path / f"{a}.parquet")
+    rows = [{"date": f"2024-01-0{d}T00:00:00.000Z", "close": 1.0} for d in (2, 3, 4, 5)]  # alle Sessions 2.–5.1.
+    save_parquet(lr._records_table(rows), tmp_path / "SPY.parquet")
+    save_parquet(lr._records_table(rows[:-1]), tmp_path / "QQQ.parquet")  # letzte Session fehlt
+    written = download_raw_prices(["SPY", "QQQ"], "2024-01-01", "2024-01-05")
+    assert calls == ["QQQ"] and len(written) == 2
+    download_raw_prices(["SPY"], "2024-01-01", "2024-01-05", force_refresh=True)
+    assert calls == ["QQQ", "SPY"]
+    import math, os, time
+    old = time.time() - lr.CACHE_TTL_SEC - 1
+    save_parquet(lr._records_table(rows), tmp_path / "IWM.parquet")  # deckt ab, ist aber veraltet
+    os.utime(tmp_path / "IWM.parquet", (old, old))
+    download_raw_prices(["IWM"], "2024-01-01", "2024-01-05", cache_ttl=math.inf)  # unbegrenzte Gültigkeit
+    assert calls == ["QQQ", "SPY"]
+    download_raw_prices(["IWM"], "2024-01-01", "2024-01-05")
+    assert calls == ["QQQ", "SPY", "IWM"]
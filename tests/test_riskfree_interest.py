@@ -0,0 +1,81 @@
+"""
+Offline-Tests für den FRED-Abruf der Zinsserien.
+Prüfen Kalender-Reindex, Batch-Abruf und Antwort-Cache ohne Netzwerkzugriff.
+"""
+
+# Testmodul für ``src.features.riskfree_interest``.
+# Eine Fake-Session liefert FRED-Antworten je Serie und zählt die Anfragen.
+# Validiert, dass übergebene Sessions, Batch- und Einzelabruf identische
+# Serien liefern und der Plattencache den API-Key ignoriert.
+# Edge-Cases: Feiertage vor der ersten Session, fehlende Werte ("."), leere Serien.
+
+import importlib  # Modul mit geänderter Umgebung neu laden
+import json  # Antworten der Fake-Session serialisieren
+import pandas as pd  # Serienvergleich
+
+# Modul unter Test
+import src.features.riskfree_interest as rf
+# NYSE-Handelskalender für vorgegebene Sessions
+from src.data.calendar import nyse_trading_days
+
+
+class _FakeFred:
+    """Offline-Ersatz für die FRED-Session: Antworten je Serie, Aufrufe werden gezählt."""
+
+    def __init__(self, bodies):
+        self.bodies, self.calls = bodies, []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append(params["series_id"])
+        resp = type("FakeResponse", (), {"raise_for_status": lambda self: None})()
+        resp.content = json.dumps({"observations": self.bodies[params["series_id"]]}).encode("utf-8")
+        return resp
+
+
+def test_fred_reuses_given_sessions():
+    """Übergebene Sessions ersetzen den Kalender, Ergebnis bleibt gleich."""
+    fake = _FakeFred({"DFF": [
+        {"date": "2024-01-01", "value": "5.3"},  # Feiertag vor der ersten Session
+        {"date": "2024-01-02", "value": "."},  # fehlender Wert → ffill
+        {"date": "2024-01-05", "value": "5.4"},
+    ]})
+    kw = dict(series_id="DFF", start="2024-01-01", end="2024-01-08", api_key="abc", session=fake, cache_dir=None)
+    sessions = nyse_trading_days(start="2024-01-01", end="2024-01-08", tz="UTC")
+    got = rf.fetch_fred_nyse_daily(**kw, sessions=sessions)
+    pd.testing.assert_series_equal(got, rf.fetch_fred_nyse_daily(**kw))
+    assert got.index.equals(sessions) and got.tolist()[3:] == [5.4, 5.4]  # Werte landen auf den Sessions
+
+
+def test_fred_batch_matches_single_series():
+    """Batch-Abruf: ein Request je Serie, Spalten == Einzelabruf auf gemeinsamem Kalender."""
+    fake = _FakeFred({
+        "DFF": [{"date": "2024-01-02", "value": "5.33"}, {"date": "2024-01-04", "value": "5.31"}],
+        "DGS3MO": [{"date": "2024-01-02", "value": "5.40"}, {"date": "2024-01-03", "value": "."}],
+        "EMPTY": [],
+    })
+    kw = dict(start="2024-01-01", end="2024-01-05", api_key="abc", session=fake, cache_dir=None)
+    wide = rf.fetch_fred_nyse_daily_batch(["DGS3MO", "DFF", "EMPTY"], **kw)
+    assert sorted(fake.calls) == ["DFF", "DGS3MO", "EMPTY"]
+    assert list(wide.columns) == ["DGS3MO", "DFF", "EMPTY"] and wide["EMPTY"].isna().all()
+    for sid in ("DGS3MO", "DFF"):
+        pd.testing.assert_series_equal(wide[sid], rf.fetch_fred_nyse_daily(sid, **kw))
+
+
+def test_fred_disk_cache_without_key(tmp_path):
+    """Frische Einträge kommen aus dem Cache, unabhängig vom API-Key."""
+    fake = _FakeFred({"DFF": [{"date": "2024-01-02", "value": "5.33"}]})
+    kw = dict(series_id="DFF", start="2024-01-01", end="2024-01-05", session=fake, cache_dir=tmp_path)
+    first = rf.fetch_fred_nyse_daily(api_key="abc", **kw)
+    second = rf.fetch_fred_nyse_daily(api_key="xyz", **kw)  # anderer Key → gleicher Eintrag
+    assert fake.calls == ["DFF"]
+    pd.testing.assert_series_equal(first, second)
+
+
+def test_fred_cache_dir_env_override(tmp_path, monkeypatch):
+    """``FRED_CACHE_DIR`` lenkt den FRED-Antwort-Cache um."""
+    monkeypatch.setenv("FRED_CACHE_DIR", str(tmp_path / "fred"))
+    try:
+        assert importlib.reload(rf).FRED_CACHE_DIR == tmp_path / "fred"
+    finally:
+        monkeypatch.delenv("FRED_CACHE_DIR")
+        importlib.reload(rf)  # Standardpfad für übrige Tests wiederherstellen